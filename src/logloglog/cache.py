@@ -63,10 +63,12 @@ class Cache:
         if not self.cache_dir.exists():
             return
 
-        for cache_subdir in self.cache_dir.iterdir():
-            if not cache_subdir.is_dir():
-                continue
+        # scandir's entries know their type from the directory listing, so
+        # skipping non-directories costs no stat per entry
+        with os.scandir(self.cache_dir) as entries:
+            cache_subdirs = [Path(entry.path) for entry in entries if entry.is_dir()]
 
+        for cache_subdir in cache_subdirs:
             # Check if the symlink exists and points to a valid file
             symlink_path = cache_subdir / "file"
             if symlink_path.exists():
@@ -1,8 +1,16 @@
 """Simple line indexing with periodic summaries for efficient wrapping calculations."""
 
 import logging
+import mmap
+import os
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate, chain, islice
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 from arrayfile import Array
 
 logger = logging.getLogger(__name__)
@@ -10,6 +18,124 @@ logger = logging.getLogger(__name__)
 # Configuration
 MAX_WIDTH = 512  # Maximum terminal width we support
 SUMMARY_INTERVAL = 1000  # Store summary every N lines
+BLOCK_ROWS_CACHE_SIZE = 256  # Complete blocks' cumulative rows kept per index, see _block_rows()
+
+
+def _extend_array(target: Array, values: Sequence[int]):
+    """
+    Append values to an Array with a single copy into its mmap.
+
+    Array.extend() packs and writes one element at a time; this grows the
+    file once and copies a packed buffer in one slice assignment.
+    """
+    if not values:
+        return
+    data = values if isinstance(values, array) and values.typecode == target._dtype else array(target._dtype, values)
+    with target._lock:
+        new_len = target._len + len(data)
+        if new_len > target._capacity:
+            # Grow geometrically so the remaps stay logarithmic in the index size;
+            # Array.close() truncates the slack away again
+            old_size = target._data_offset + target._capacity_bytes
+            target._resize(max(new_len, target._capacity * 2))
+            _reserve_blocks(target, old_size)
+        offset = target._data_offset + target._len * target._element_size
+        target._mmap[offset : offset + len(data) * data.itemsize] = data
+        target._len = new_len
+
+
+def _reserve_blocks(target: Array, start: int):
+    """
+    Allocate disk blocks for an Array's file from start to its current end.
+
+    Resizing only truncates the file longer, leaving a sparse hole that gets
+    allocated page fault by page fault as the mmap is written, and raises
+    SIGBUS instead of an error if the disk fills up meanwhile.
+    """
+    if not hasattr(os, "posix_fallocate"):
+        return
+    end = target._data_offset + target._capacity_bytes
+    try:
+        os.posix_fallocate(target._file.fileno(), start, end - start)
+    except OSError as e:
+        # Not supported by every filesystem; the sparse file still works
+        logger.debug(f"posix_fallocate failed, leaving index file sparse: {e}")
+
+
+def _release_all(views: List[memoryview]):
+    """Release and forget a list of memoryviews."""
+    for view in views:
+        view.release()
+    views.clear()
+
+
+@lru_cache(maxsize=4096)
+def _row_runs(line_width: int) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    Split terminal widths 1..MAX_WIDTH into runs where a line takes the same rows.
+
+    Rows for a line of width w are ceil(w / t), which only changes value
+    O(sqrt(w)) times as the terminal width t goes from 1 to MAX_WIDTH.
+
+    Args:
+        line_width: Display width of the line
+
+    Returns:
+        Tuples of (first index, index past the end, rows), indexed by terminal width - 1
+    """
+    runs = []
+    # Empty lines always take 1 row regardless of terminal width
+    # ceil(w / t) == (w - 1) // t + 1 for w >= 1
+    m = max(line_width, 1) - 1
+    term_width = 1
+    while True:
+        q = m // term_width
+        last_width = m // q if q else MAX_WIDTH
+        if last_width >= MAX_WIDTH:
+            runs.append((term_width - 1, MAX_WIDTH, q + 1))
+            return tuple(runs)
+        runs.append((term_width - 1, last_width, q + 1))
+        term_width = last_width + 1
+
+
+def summarize_widths(width_counts: Dict[int, int]) -> array:
+    """
+    Calculate total display rows of a block of lines for each terminal width.
+
+    Each line width contributes its cached runs of equal row counts to a
+    difference array, then one prefix sum gives the totals.
+
+    Args:
+        width_counts: Mapping of line width to number of lines with that width
+
+    Returns:
+        uint32 array of MAX_WIDTH totals, index i being terminal width i + 1,
+        packed the same as the summaries file so it can be copied in as-is
+    """
+    diff = [0] * (MAX_WIDTH + 1)
+    for line_width, count in width_counts.items():
+        for first, end, rows in _row_runs(line_width):
+            diff[first] += rows * count
+            diff[end] -= rows * count
+
+    return array("I", accumulate(diff[:MAX_WIDTH]))
+
+
+def count_rows(line_widths: Iterable[int], width: int) -> int:
+    """
+    Total display rows taken by lines at a terminal width.
+
+    Lines are counted by width first, so each distinct width is divided once
+    however many lines share it.
+
+    Args:
+        line_widths: Display widths of the lines
+        width: Terminal width
+
+    Returns:
+        Sum of the rows for each line, empty lines taking 1 row
+    """
+    return sum(((line_width + width - 1) // width or 1) * count for line_width, count in Counter(line_widths).items())
 
 
 class LineIndex:
@@ -30,8 +156,15 @@ class LineIndex:
         self._summaries = None
         self._line_count = 0
         self._current_block_width_counts = {}  # Track widths in current 1000-line block
-        self._pending_positions = []  # Batch positions for extend()
-        self._pending_widths = []  # Batch widths for extend()
+        self._pending_positions = array("Q")  # Batch positions for extend(), packed like the file
+        self._pending_widths = array("H")  # Batch widths for extend(), packed like the file
+        self._positions_view = None  # memoryview over positions mmap, see _view()
+        self._widths_view = None  # memoryview over widths mmap, see _view()
+        self._summaries_view = None  # memoryview over summaries mmap, see _view()
+        self._exported_views = []  # Every live view above, for the finalizer to release
+        self._views_finalizer = None  # See open()
+        self._block_rows_cache = {}  # (block, width) -> cumulative rows, for complete blocks
+        self._summary_ends_cache = {}  # width -> cumulative rows at the end of each complete block
 
     def open(self, create: bool = False):
         """Open index files."""
@@ -48,13 +181,28 @@ class LineIndex:
         # Summaries (uint32 array, MAX_WIDTH entries per summary)
         self._summaries = Array("I", str(self.index_path / "summaries.dat"), mode)
 
+        # Each Array closes itself in a finalizer if we're never closed, which fails while
+        # our views still export its mmap. Finalizers run newest first at exit, and this
+        # one holds no reference to us, so it also runs first if we're garbage collected
+        self._views_finalizer = weakref.finalize(self, _release_all, self._exported_views)
+
         # Count existing lines
         self._line_count = len(self._line_positions)
+        self._block_rows_cache.clear()
+        self._summary_ends_cache.clear()
+
+        # Rebuild the partial block's width counts in one pass over the mapped widths
+        block_start = self._line_count - self._line_count % SUMMARY_INTERVAL
+        self._current_block_width_counts = dict(Counter(self._iter_widths(block_start, self._line_count)))
 
     def close(self):
         """Close all index files."""
         # Flush any pending data before closing
         self._flush_pending()
+        self._release_views()
+        if self._views_finalizer is not None:
+            self._views_finalizer.detach()
+            self._views_finalizer = None
 
         if self._line_positions:
             self._line_positions.close()
@@ -91,34 +239,126 @@ class LineIndex:
             self._store_summary()
             self._current_block_width_counts.clear()
 
+    def append_lines(self, positions: Sequence[int], widths: Sequence[int]):
+        """
+        Append a batch of lines to the index.
+
+        Equivalent to calling append_line() for each pair, but extends the
+        pending buffers and width counts once per summary block.
+
+        Args:
+            positions: Byte offsets of line starts in log file
+            widths: Display widths of the lines
+        """
+        # fromlist() is the fast way into the typed pending buffers
+        if not isinstance(positions, list):
+            positions = list(positions)
+        if not isinstance(widths, list):
+            widths = list(widths)
+
+        # Cap widths at uint16 max
+        if widths and max(widths) > 65535:
+            widths = [min(width, 65535) for width in widths]
+
+        start = 0
+        while start < len(widths):
+            # Take lines up to the end of the current summary block
+            end = min(len(widths), start + SUMMARY_INTERVAL - self._line_count % SUMMARY_INTERVAL)
+            block_widths = widths[start:end]
+            self._pending_positions.fromlist(positions[start:end])
+            self._pending_widths.fromlist(block_widths)
+            self._line_count += end - start
+
+            # Track widths for current block
+            block_counts = self._current_block_width_counts
+            for width, count in Counter(block_widths).items():
+                block_counts[width] = block_counts.get(width, 0) + count
+
+            if self._line_count % SUMMARY_INTERVAL == 0:
+                self._flush_pending()
+                self._store_summary()
+                block_counts.clear()
+            start = end
+
+    def _view(self, array: Array, fmt: str) -> memoryview:
+        """Get a typed memoryview over an Array's mapped data region."""
+        start = array._data_offset
+        view = memoryview(array._mmap)[start : start + array._capacity_bytes].cast(fmt)
+        self._exported_views.append(view)
+        return view
+
+    def _release_views(self):
+        """Release mmap views so the underlying Arrays can be resized or closed."""
+        _release_all(self._exported_views)
+        self._positions_view = None
+        self._widths_view = None
+        self._summaries_view = None
+
+    def _iter_widths(self, start: int, end: int) -> Iterable[int]:
+        """
+        Iterate widths of lines [start, end) without per-line bounds checks.
+
+        Callers must have validated the range against _line_count already.
+        """
+        flushed_count = len(self._line_widths)
+        if self._widths_view is None:
+            self._widths_view = self._view(self._line_widths, "H")
+        if end <= flushed_count:
+            return self._widths_view[start:end]
+        pending = islice(self._pending_widths, max(0, start - flushed_count), end - flushed_count)
+        if start >= flushed_count:
+            return pending
+        return chain(self._widths_view[start:flushed_count], pending)
+
     def _flush_pending(self):
         """Flush pending positions and widths to disk."""
+        # Extending may remap the arrays, which fails while views are exported
+        self._release_views()
         if self._pending_positions:
-            self._line_positions.extend(self._pending_positions)
-            self._pending_positions.clear()
+            _extend_array(self._line_positions, self._pending_positions)
+            del self._pending_positions[:]
         if self._pending_widths:
-            self._line_widths.extend(self._pending_widths)
-            self._pending_widths.clear()
+            _extend_array(self._line_widths, self._pending_widths)
+            del self._pending_widths[:]
 
     def _store_summary(self):
         """Store summary using already-tracked width counts."""
-        # Calculate totals for each terminal width
-        width_totals = [0] * MAX_WIDTH
-        for line_width, count in self._current_block_width_counts.items():
-            if line_width == 0:
-                # Empty lines always take 1 row regardless of terminal width
-                for i in range(MAX_WIDTH):
-                    width_totals[i] += count
-            else:
-                # Calculate rows for each terminal width
-                # Ceiling division: (line_width + term_width - 1) // term_width
-                # This is always >= 1 when both operands are positive
-                for term_width in range(1, MAX_WIDTH + 1):
-                    rows = (line_width + term_width - 1) // term_width
-                    width_totals[term_width - 1] += rows * count
-
-        # Store all width totals in summary array (batch append for performance)
-        self._summaries.extend(width_totals)
+        _extend_array(self._summaries, summarize_widths(self._current_block_width_counts))
+
+    def _summary_column(self, width: int, count: int) -> memoryview:
+        """
+        Get the row totals at a width for the first count summary blocks.
+
+        A strided view of the summaries mmap, so summing or scanning it runs
+        in C rather than indexing the Array once per block.
+
+        Args:
+            width: Terminal width, already clamped to 1..MAX_WIDTH
+            count: Number of complete summary blocks to include
+        """
+        if self._summaries_view is None:
+            self._summaries_view = self._view(self._summaries, "I")
+        return self._summaries_view[width - 1 : count * MAX_WIDTH : MAX_WIDTH]
+
+    def _summary_ends(self, width: int) -> List[int]:
+        """
+        Get the running total of display rows at the end of each complete block.
+
+        Kept per width and only extended by the blocks summarized since the
+        last call, so totals and block searches don't re-add every summary.
+
+        Args:
+            width: Terminal width, already clamped to 1..MAX_WIDTH
+
+        Returns:
+            Cumulative rows through each complete summary block
+        """
+        ends = self._summary_ends_cache.setdefault(width, [])
+        complete_summaries = self._line_count // SUMMARY_INTERVAL
+        if len(ends) < complete_summaries:
+            new_rows = self._summary_column(width, complete_summaries)[len(ends) :]
+            ends.extend(islice(accumulate(new_rows, initial=ends[-1] if ends else 0), 1, None))
+        return ends
 
     def get_line_position(self, line_no: int) -> int:
         """Get byte position of a line."""
@@ -128,7 +368,13 @@ class LineIndex:
         # Check if it's in the flushed data or pending batch
         flushed_count = len(self._line_positions)
         if line_no < flushed_count:
-            return self._line_positions[line_no]
+            if self._positions_view is None:
+                # Positions are looked up one line at a time, all over the file, so don't
+                # let the kernel read ahead around each lookup
+                if hasattr(mmap, "MADV_RANDOM"):
+                    self._line_positions._mmap.madvise(mmap.MADV_RANDOM)
+                self._positions_view = self._view(self._line_positions, "Q")
+            return self._positions_view[line_no]
         else:
             # It's in the pending batch
             pending_idx = line_no - flushed_count
@@ -142,7 +388,9 @@ class LineIndex:
         # Check if it's in the flushed data or pending batch
         flushed_count = len(self._line_widths)
         if line_no < flushed_count:
-            return self._line_widths[line_no]
+            if self._widths_view is None:
+                self._widths_view = self._view(self._line_widths, "H")
+            return self._widths_view[line_no]
         else:
             # It's in the pending batch
             pending_idx = line_no - flushed_count
@@ -158,26 +406,19 @@ class LineIndex:
         Returns:
             Total number of display rows
         """
-        if width <= 0:
-            return 0  # No display possible with zero or negative width
+        if width <= 0 or not self._line_count:
+            return 0  # No display possible with zero or negative width, or nothing to display
         if width > MAX_WIDTH:
             width = MAX_WIDTH
 
-        total_rows = 0
-
-        # Add up complete summaries
+        # Rows through the complete summaries
         complete_summaries = self._line_count // SUMMARY_INTERVAL
-        for i in range(complete_summaries):
-            summary_offset = i * MAX_WIDTH + (width - 1)
-            total_rows += self._summaries[summary_offset]
+        summary_ends = self._summary_ends(width)
+        total_rows = summary_ends[-1] if complete_summaries else 0
 
         # Add remaining lines not in a summary
         start_line = complete_summaries * SUMMARY_INTERVAL
-        for line_idx in range(start_line, self._line_count):
-            line_width = self.get_line_width(line_idx)
-            # Ceiling division is always >= 1 for positive operands
-            rows = (line_width + width - 1) // width if width > 0 and line_width > 0 else 1
-            total_rows += rows
+        total_rows += count_rows(self._iter_widths(start_line, self._line_count), width)
 
         return total_rows
 
@@ -200,20 +441,14 @@ class LineIndex:
         if width > MAX_WIDTH:
             width = MAX_WIDTH
 
-        display_row = 0
-
-        # Add complete summaries before this line
+        # Rows through the complete summaries before this line
         summary_idx = line_no // SUMMARY_INTERVAL
-        for i in range(summary_idx):
-            summary_offset = i * MAX_WIDTH + (width - 1)
-            display_row += self._summaries[summary_offset]
+        display_row = self._summary_ends(width)[summary_idx - 1] if summary_idx else 0
 
-        # Add individual lines from last summary to target line
-        start_line = summary_idx * SUMMARY_INTERVAL
-        for line_idx in range(start_line, line_no):
-            line_width = self.get_line_width(line_idx)
-            rows = (line_width + width - 1) // width if width > 0 and line_width > 0 else 1
-            display_row += rows
+        # Rows of the block's earlier lines, from its (usually cached) running totals
+        preceding_lines = line_no - summary_idx * SUMMARY_INTERVAL
+        if preceding_lines:
+            display_row += self._block_rows(summary_idx, width)[preceding_lines - 1]
 
         return display_row
 
@@ -233,41 +468,57 @@ class LineIndex:
         if width > MAX_WIDTH:
             width = MAX_WIDTH
 
-        current_row = 0
+        # Binary search the summaries' running totals for the block containing our display row,
+        # landing past the end if it's in the incomplete last block
+        summary_ends = self._summary_ends(width)
+        summary_idx = bisect_right(summary_ends, display_row)
+        current_row = summary_ends[summary_idx - 1] if summary_idx else 0
 
-        # Binary search through summaries to find the right range
-        complete_summaries = self._line_count // SUMMARY_INTERVAL
-        summary_idx = 0
-
-        # Find which summary block contains our display row
-        for i in range(complete_summaries):
-            summary_offset = i * MAX_WIDTH + (width - 1)
-            summary_rows = self._summaries[summary_offset]
-            if current_row + summary_rows > display_row:
-                summary_idx = i
-                break
-            current_row += summary_rows
-        else:
-            # It's in the incomplete last block
-            summary_idx = complete_summaries
-
-        # Linear search within the summary block
+        # Prefix-sum the block's row counts and binary search for the target row
         start_line = summary_idx * SUMMARY_INTERVAL
-        end_line = min(start_line + SUMMARY_INTERVAL, self._line_count)
+        cumulative_rows = self._block_rows(summary_idx, width)
+
+        target = display_row - current_row
+        block_idx = bisect_right(cumulative_rows, target)
+        if block_idx == len(cumulative_rows):
+            # Display row is beyond the end
+            raise IndexError(f"Display row {display_row} out of range")
 
-        for line_idx in range(start_line, end_line):
-            line_width = self.get_line_width(line_idx)
-            rows = (line_width + width - 1) // width if width > 0 and line_width > 0 else 1
+        offset_within_line = target - (cumulative_rows[block_idx - 1] if block_idx else 0)
+        return (start_line + block_idx, offset_within_line)
 
-            if current_row + rows > display_row:
-                # Found the line
-                offset_within_line = display_row - current_row
-                return (line_idx, offset_within_line)
+    def _block_rows(self, block: int, width: int) -> List[int]:
+        """
+        Get the running total of display rows through a summary block's lines.
+
+        Complete blocks never change, so their totals are cached per width;
+        scrolling looks up the same few blocks over and over.
+
+        Args:
+            block: Summary block number
+            width: Terminal width, already clamped to 1..MAX_WIDTH
+
+        Returns:
+            Cumulative rows after each line of the block
+        """
+        key = (block, width)
+        cumulative_rows = self._block_rows_cache.get(key)
+        if cumulative_rows is not None:
+            return cumulative_rows
+
+        start_line = block * SUMMARY_INTERVAL
+        end_line = min(start_line + SUMMARY_INTERVAL, self._line_count)
 
-            current_row += rows
+        # Empty lines still take 1 row
+        rows = ((line_width + width - 1) // width or 1 for line_width in self._iter_widths(start_line, end_line))
+        cumulative_rows = list(accumulate(rows))
 
-        # Display row is beyond the end
-        raise IndexError(f"Display row {display_row} out of range")
+        if end_line - start_line == SUMMARY_INTERVAL:
+            if len(self._block_rows_cache) >= BLOCK_ROWS_CACHE_SIZE:
+                # Drop the oldest entry, dicts keep insertion order
+                del self._block_rows_cache[next(iter(self._block_rows_cache))]
+            self._block_rows_cache[key] = cumulative_rows
+        return cumulative_rows
 
     def __len__(self) -> int:
         """Get total number of indexed lines."""
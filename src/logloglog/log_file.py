@@ -1,8 +1,26 @@
 """Simple file abstraction for log file operations."""
 
 import asyncio
+import os
+from bisect import bisect_right
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Sequence, Union
+
+# Bytes per read_chunk() call when indexing, and the widest span of one read in read_lines_at()
+READ_CHUNK_SIZE = 1 << 22
+
+# Bytes per positional read in read_line_at(), enough for most lines in one call
+LINE_READ_SIZE = 1 << 12
+
+
+def split_chunk(data: bytes) -> list[bytes]:
+    """Split a chunk from LogFile.read_chunk() into raw lines without newlines."""
+    if not data:
+        return []
+    lines = data.split(b"\n")
+    if not lines[-1]:
+        lines.pop()  # Data ended with a newline, not an unterminated line
+    return lines
 
 
 class LogFile:
@@ -11,7 +29,7 @@ class LogFile:
 
     Keeps file handle open during batch operations for performance.
     Call open() to start a batch read session, close() when done.
-    Individual operations (append, get_size) open/close as needed.
+    Appends go through a handle opened on first use and kept until close().
     """
 
     def __init__(self, path: Union[Path, str], mode: str = "r"):
@@ -26,6 +44,7 @@ class LogFile:
         self.mode = mode
         self._read_position = 0
         self._file_handle = None
+        self._append_handle = None
 
         # Validate mode
         if mode not in ("r", "a", "w"):
@@ -40,12 +59,19 @@ class LogFile:
         if self._file_handle is None:
             self._file_handle = open(self.path, "rb")
             self._file_handle.seek(self._read_position)
+            # Indexing reads the file front to back in big chunks, so ask for aggressive
+            # readahead; line lookups read a few pages at a time either way
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(self._file_handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
 
     def close(self):
-        """Close the file handle. Call this after batch operations complete."""
+        """Close the file handles. Call this after batch operations complete."""
         if self._file_handle is not None:
             self._file_handle.close()
             self._file_handle = None
+        if self._append_handle is not None:
+            self._append_handle.close()
+            self._append_handle = None
 
     def read_line(self) -> Optional[str]:
         """
@@ -54,16 +80,133 @@ class LogFile:
         Returns:
             The next line without trailing newline, or None if no more data.
         """
+        line_bytes = self.read_line_bytes()
+        return None if line_bytes is None else line_bytes.decode("utf-8", errors="replace")
+
+    def read_line_bytes(self) -> Optional[bytes]:
+        """
+        Read the next line from the current position without decoding it.
+
+        Returns:
+            The next line's raw bytes without trailing newline, or None if no more data.
+        """
         try:
             line_bytes = self._file_handle.readline()
             if line_bytes:
                 # Track position without syscall - we know it's current + bytes read
                 self._read_position += len(line_bytes)
-                return line_bytes.decode("utf-8", errors="replace").rstrip("\r\n")
+                return line_bytes.rstrip(b"\r\n")
         except (IOError, OSError):
             pass
         return None
 
+    def read_line_at(self, position: int) -> Optional[str]:
+        """
+        Read the line starting at a byte position without moving the read position.
+
+        Args:
+            position: Byte offset of the start of the line
+
+        Returns:
+            The line without trailing newline, or None if position is at or past EOF.
+        """
+        line_bytes = self._read_raw_line_at(position)
+        return line_bytes.decode("utf-8", errors="replace").rstrip("\r\n") if line_bytes else None
+
+    def _pread(self, size: int, position: int) -> bytes:
+        """Read up to size bytes at a byte position without moving the read position."""
+        if hasattr(os, "pread"):
+            return os.pread(self._file_handle.fileno(), size, position)
+        # No positional reads on this platform, so seek the handle and put it back
+        self._file_handle.seek(position)
+        data = self._file_handle.read(size)
+        self._file_handle.seek(self._read_position)
+        return data
+
+    def _read_raw_line_at(self, position: int) -> bytes:
+        """Read the line starting at a byte position, including its newline if it has one."""
+        chunks = []
+        while True:
+            chunk = self._pread(LINE_READ_SIZE, position)
+            newline = chunk.find(b"\n")
+            if newline != -1:
+                chunks.append(chunk[: newline + 1])
+                break
+            chunks.append(chunk)
+            if len(chunk) < LINE_READ_SIZE:
+                break  # EOF
+            position += len(chunk)
+        return b"".join(chunks)
+
+    def read_lines_at(self, positions: Sequence[int]) -> list[Optional[str]]:
+        """
+        Read the lines starting at several byte positions without moving the read position.
+
+        Nearby lines, like consecutive ones, come out of a single positional
+        read instead of one read each. Each read spans at most about
+        READ_CHUNK_SIZE bytes, however far apart the lines are.
+
+        Args:
+            positions: Byte offsets of the starts of the lines, in ascending order
+
+        Returns:
+            Each line without trailing newline, or None where a position is at or past EOF.
+        """
+        lines = []
+        first = 0
+        while first < len(positions):
+            base = positions[first]
+            last = bisect_right(positions, base + READ_CHUNK_SIZE, first) - 1
+            data = self._pread(positions[last] - base + LINE_READ_SIZE, base)
+            for position in positions[first : last + 1]:
+                start = position - base
+                end = data.find(b"\n", start)
+                if end == -1:
+                    # Line runs past what was read (or there's no line there)
+                    lines.append(self.read_line_at(position))
+                else:
+                    lines.append(data[start:end].decode("utf-8", errors="replace").rstrip("\r"))
+            first = last + 1
+        return lines
+
+    def read_chunk(self, chunk_size: int = READ_CHUNK_SIZE) -> bytes:
+        """
+        Read a chunk of whole lines from the current position.
+
+        Reads roughly chunk_size bytes, then completes the final partial line,
+        so a chunk never ends mid-line.
+
+        Args:
+            chunk_size: Approximate number of bytes to read
+
+        Returns:
+            Raw bytes including line endings, or empty bytes if no more data.
+        """
+        try:
+            data = self._pread(chunk_size, self._read_position)
+            if data and not data.endswith(b"\n"):
+                data += self._read_raw_line_at(self._read_position + len(data))
+        except (IOError, OSError):
+            return b""
+
+        self._read_position += len(data)
+        # Keep the handle in step, so read_line() carries on after this chunk
+        self._file_handle.seek(self._read_position)
+        return data
+
+    def read_lines(self, chunk_size: int = READ_CHUNK_SIZE) -> list[bytes]:
+        """
+        Read a batch of whole lines from the current position.
+
+        Args:
+            chunk_size: Approximate number of bytes to read
+
+        Returns:
+            Raw lines without the trailing newline (a trailing carriage return
+            is kept), or an empty list if no more data.
+        """
+        return split_chunk(self.read_chunk(chunk_size))
+
     def read_all_lines(self) -> list[str]:
         """
         Read all remaining lines from current position.
@@ -76,24 +219,41 @@ class LogFile:
             lines.append(line)
         return lines
 
-    def append_line(self, line: str) -> None:
+    def _appender(self):
+        """
+        Get the persistent append handle, opening it on first use.
+
+        Raises:
+            IOError: If file is opened in read-only mode
+        """
+        if self.mode == "r":
+            raise IOError("Cannot write to file opened in read-only mode")
+        if self._append_handle is None:
+            self._append_handle = open(self.path, "ab")
+        return self._append_handle
+
+    def append_line(self, line: str) -> int:
         """
         Append a line to the file.
 
         Args:
             line: Line to append (newline will be added automatically)
 
+        Returns:
+            Byte offset the line was written at
+
         Raises:
             IOError: If file is opened in read-only mode
         """
-        if self.mode == "r":
-            raise IOError("Cannot write to file opened in read-only mode")
-
-        with open(self.path, "ab") as f:
-            # Ensure line ends with newline
-            if not line.endswith("\n"):
-                line += "\n"
-            f.write(line.encode("utf-8"))
+        f = self._appender()
+        # Other writers may have appended since our last write, so ask for the real end
+        position = f.seek(0, os.SEEK_END)
+        # Ensure line ends with newline
+        if not line.endswith("\n"):
+            line += "\n"
+        f.write(line.encode("utf-8"))
+        f.flush()
+        return position
 
     def append_lines(self, lines: list[str]) -> None:
         """
@@ -102,14 +262,12 @@ class LogFile:
         Args:
             lines: Lines to append (newlines will be added as needed)
         """
-        if self.mode == "r":
-            raise IOError("Cannot write to file opened in read-only mode")
-
-        with open(self.path, "ab") as f:
-            for line in lines:
-                if not line.endswith("\n"):
-                    line += "\n"
-                f.write(line.encode("utf-8"))
+        f = self._appender()
+        for line in lines:
+            if not line.endswith("\n"):
+                line += "\n"
+            f.write(line.encode("utf-8"))
+        f.flush()
 
     def has_more_data(self) -> bool:
         """
@@ -166,13 +324,17 @@ class LogFile:
         """Async version of read_line()."""
         return await asyncio.to_thread(self.read_line)
 
+    async def aread_line_bytes(self) -> Optional[bytes]:
+        """Async version of read_line_bytes()."""
+        return await asyncio.to_thread(self.read_line_bytes)
+
     async def aread_all_lines(self) -> list[str]:
         """Async version of read_all_lines()."""
         return await asyncio.to_thread(self.read_all_lines)
 
-    async def aappend_line(self, line: str) -> None:
+    async def aappend_line(self, line: str) -> int:
         """Async version of append_line()."""
-        await asyncio.to_thread(self.append_line, line)
+        return await asyncio.to_thread(self.append_line, line)
 
     async def aappend_lines(self, lines: list[str]) -> None:
         """Async version of append_lines()."""
@@ -1,11 +1,16 @@
 """Main LogLogLog implementation."""
 
 import os
+import re
 import shutil
 import time
 import logging
 import asyncio
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from functools import lru_cache
+from itertools import accumulate, repeat
 from pathlib import Path
 from typing import Callable, List, Iterator, Tuple, Union
 from wcwidth import wcswidth
@@ -13,33 +18,101 @@ from wcwidth import wcswidth
 from .widthview import WidthView
 from .line_index import LineIndex
 from .cache import Cache
-from .log_file import LogFile
+from .log_file import LogFile, READ_CHUNK_SIZE, split_chunk
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Bytes per chunk when indexing against a time budget in aupdate()
+ASYNC_CHUNK_SIZE = 1 << 16
+
+# Unindexed bytes above which update() splits the scan across processes, if enabled
+PARALLEL_INDEX_THRESHOLD = 1 << 26
+
+# Most lines fetched per positional read when iterating; batches start small and
+# double up to this, so short walks from the middle of a log don't over-read
+ITER_BATCH_LINES = 1024
+
+# Any of \r\n, \r or \n ends a line. str.splitlines() would also split on
+# form feeds, vertical tabs and Unicode separators that can appear in logs.
+LINE_BREAK_RE = re.compile(r"\r\n?|\n")
+
 
-@lru_cache(maxsize=100000)
 def default_get_width(line: str) -> int:
-    """Fast line width calculation with ASCII fast path and caching."""
-    # Fast path for ASCII (99% of log lines)
+    """Fast line width calculation with ASCII fast path."""
+    # Fast path for ASCII (99% of log lines), cheaper than any cache lookup
     if line.isascii():
         return len(line)
-    # Slow path for Unicode
+    return _unicode_width(line)
+
+
+@lru_cache(maxsize=4096)
+def _unicode_width(line: str) -> int:
+    """Slow path width calculation for non-ASCII lines, cached."""
     width = wcswidth(line)
     return max(0, width if width is not None else len(line))
 
 
+def default_get_widths(lines: List[bytes]) -> List[int]:
+    """Batch line width calculation for raw UTF-8 lines, with an all-ASCII fast path."""
+    # ASCII width is the byte length, checked and measured for the whole batch in C
+    if all(map(bytes.isascii, lines)):
+        return list(map(len, lines))
+    return [len(line) if line.isascii() else _unicode_width(line.decode("utf-8", errors="replace")) for line in lines]
+
+
+def strip_carriage_returns(lines: List[bytes]) -> List[bytes]:
+    """Strip trailing carriage returns from raw lines."""
+    return list(map(bytes.rstrip, lines, repeat(b"\r")))
+
+
 def default_split_lines(text: str) -> List[str]:
     """Default line splitting on newlines."""
-    # Handle different line endings
-    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    # Handle different line endings in a single pass, with str.split for plain \n text
+    lines = LINE_BREAK_RE.split(text) if "\r" in text else text.split("\n")
     # Don't lose empty lines
     if text.endswith("\n"):
         lines.pop()  # Remove last empty element from split
     return lines
 
 
+def _scan_range(path: Path, start: int, end: int) -> Tuple[array, array, int]:
+    """
+    Scan the lines in a byte range of a file using the default width function.
+
+    Runs in a worker process, so it only touches its own file handle.
+
+    Args:
+        path: Path to the log file
+        start: Byte offset of the first line in the range
+        end: Byte offset just past the range, on a line boundary
+
+    Returns:
+        Tuple of (line positions, line widths, byte offset reached)
+    """
+    positions = array("Q")
+    widths = array("I")
+    log_file = LogFile(path)
+    log_file.seek_to(start)
+    log_file.open()
+    try:
+        raw_pos = start
+        while log_file.get_position() < end:
+            chunk = log_file.read_chunk(min(READ_CHUNK_SIZE, end - log_file.get_position()))
+            lines = split_chunk(chunk)
+            if not lines:
+                break
+            positions.extend(accumulate([len(line) + 1 for line in lines[:-1]], initial=raw_pos))
+            raw_pos = log_file.get_position()
+            if b"\r" in chunk:
+                lines = strip_carriage_returns(lines)
+            widths.extend(map(len, lines) if chunk.isascii() else default_get_widths(lines))
+        end = log_file.get_position()
+    finally:
+        log_file.close()
+    return positions, widths, end
+
+
 class LogLogLog:
     """
     Efficient scrollback indexing for large log files.
@@ -54,6 +127,7 @@ class LogLogLog:
         split_lines: Callable[[str], List[str]] = None,
         cache: Cache = None,
         defer_indexing: bool = False,
+        parallel_indexing: bool = False,
     ):
         """
         Initialize LogLogLog for a file.
@@ -64,8 +138,12 @@ class LogLogLog:
             split_lines: Function to split text into lines (defaults to newline split)
             cache: Cache instance (auto-created if None)
             defer_indexing: If True, skip initial indexing (useful for UI responsiveness)
+            parallel_indexing: If True, split large scans across worker processes
+                (only with the default get_width; falls back to one process on failure)
         """
         # Handle path/LogFile parameter
+        # Only close the LogFile on close() if we created it
+        self._owns_log_file = not isinstance(path, LogFile)
         if isinstance(path, LogFile):
             self.log_file = path
             self.path = path.path.resolve()
@@ -77,6 +155,7 @@ class LogLogLog:
 
         self.get_width = get_width or default_get_width
         self.split_lines = split_lines or default_split_lines
+        self.parallel_indexing = parallel_indexing
 
         # Set up cache
         self.cache = cache or Cache()
@@ -87,22 +166,28 @@ class LogLogLog:
 
         # File size tracking
         self._file_size_path = self._index_path / "file_size.dat"
+        self._saved_file_size = None  # What file_size.dat holds, so unchanged sizes aren't rewritten
 
         # File tracking
         self._file_stat = None
 
+        # Bumped whenever the index changes, so cached totals know when they're stale
+        self._version = 0
+        self._total_rows_cache = {}  # width -> (version, total rows)
+
         # Open and validate index (unless deferred)
         if not defer_indexing:
             self._open()
 
     def _check_index_files_exist(self) -> bool:
         """Check if all index files exist."""
-        return (
-            (self._index_path / "positions.dat").exists()
-            and (self._index_path / "widths.dat").exists()
-            and (self._index_path / "summaries.dat").exists()
-            and self._file_size_path.exists()
-        )
+        # One directory listing rather than a stat per file
+        try:
+            with os.scandir(self._index_path) as entries:
+                names = {entry.name for entry in entries}
+        except FileNotFoundError:
+            return False
+        return {"positions.dat", "widths.dat", "summaries.dat", self._file_size_path.name} <= names
 
     def _try_load_existing_index(self) -> bool:
         """
@@ -119,7 +204,7 @@ class LogLogLog:
             if len(self._line_index) > 0:
                 last_offset = self._line_index.get_line_position(len(self._line_index) - 1)
                 self.log_file.seek_to(last_offset)
-                self.log_file.read_line()  # Read to end of last line
+                self.log_file.read_line_bytes()  # Read to end of last line, no need to decode
                 last_position = self.log_file.get_position()
                 logger.debug(f"Calculated last_position: {last_position:,} from offset {last_offset:,}")
             else:
@@ -207,7 +292,7 @@ class LogLogLog:
             if len(self._line_index) > 0:
                 last_offset = self._line_index.get_line_position(len(self._line_index) - 1)
                 self.log_file.seek_to(last_offset)
-                await self.log_file.aread_line()  # Read to end of last line (async)
+                await self.log_file.aread_line_bytes()  # Read to end of last line (async, no decode)
                 last_position = self.log_file.get_position()
                 logger.debug(f"Calculated last_position: {last_position:,} from offset {last_offset:,}")
             else:
@@ -305,16 +390,23 @@ class LogLogLog:
 
     def _save_file_size(self, file_size):
         """Save the file size to cache metadata."""
-        with open(self._file_size_path, "w") as f:
-            f.write(str(file_size))
+        if file_size == self._saved_file_size:
+            return
+        # Write beside it and rename, so a crash never leaves a half-written size
+        tmp_path = self._file_size_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(str(file_size).encode())
+        os.replace(tmp_path, self._file_size_path)
+        self._saved_file_size = file_size
 
     def _load_file_size(self):
         """Load the cached file size, returns None if not found."""
         try:
             with open(self._file_size_path, "r") as f:
-                return int(f.read().strip())
+                self._saved_file_size = int(f.read().strip())
         except (FileNotFoundError, ValueError):
-            return None
+            self._saved_file_size = None
+        return self._saved_file_size
 
     def _clear_index(self):
         """Clear the index directory."""
@@ -323,12 +415,14 @@ class LogLogLog:
             shutil.rmtree(self._index_path)
         # Get a fresh cache directory
         self._index_path = self.cache.get_dir(self.path)
-        self.log_file.seek_to(0)
+        self._saved_file_size = None
+        self._version += 1
 
     def close(self):
         """Close all resources."""
-        # LogFile handles its own file management
         self._line_index.close()
+        if self._owns_log_file:
+            self.log_file.close()
 
     def __enter__(self):
         """Context manager entry."""
@@ -365,26 +459,27 @@ class LogLogLog:
         # Stream process new content instead of reading entire file into RAM
         stream_start = time.time()
 
-        # Process line by line to avoid loading huge files into memory
+        # Process a chunk at a time to avoid loading huge files into memory
         width_count = 0
         process_start = time.time()
 
-        # File is already open from __init__
-        while True:
-            # Get raw byte position before reading line
-            raw_pos = self.log_file.get_position()
-            line = self.log_file.read_line()
-
-            if line is None:
-                break  # EOF
+        # Large cold scans with the default width function can be split across CPUs
+        unindexed = current_size - self.log_file.get_position()
+        if (
+            self.parallel_indexing
+            and self.get_width is default_get_width
+            and unindexed > PARALLEL_INDEX_THRESHOLD
+            and (os.cpu_count() or 1) > 1
+        ):
+            width_count += self._index_parallel(current_size)
+            logger.info(f"Parallel indexing took {time.time() - process_start:.3f}s for {width_count:,} lines")
 
-            # Calculate width and add to index
-            width = self.get_width(line)
-            self._line_index.append_line(raw_pos, width)
-            width_count += 1
+        # File is already open from __init__
+        while lines_processed := self._index_chunk():
+            width_count += lines_processed
 
-            # Progress logging for large files
-            if width_count % 100000 == 0:
+            # Progress logging for large files, once per 100k lines crossed
+            if width_count // 100000 > (width_count - lines_processed) // 100000:
                 elapsed = time.time() - process_start
                 rate = width_count / elapsed if elapsed > 0 else 0
                 logger.info(f"Processed {width_count:,} lines in {elapsed:.1f}s ({rate:.0f} lines/sec)")
@@ -395,12 +490,59 @@ class LogLogLog:
             # No tree update needed - summaries are created automatically during append
             # LineIndex handles flushing internally
 
-        # Save current file size to cache metadata
-        current_file_size = self.log_file.get_size()
-        self._save_file_size(current_file_size)
+        # Save the size seen before indexing rather than stat again; if the file grew
+        # meanwhile this is an underestimate, which truncation checks treat as safe
+        self._save_file_size(current_size)
 
         logger.info(f"Total update time: {time.time() - start_time:.3f}s")
 
+    def _index_parallel(self, end: int) -> int:
+        """
+        Index from the current position up to end using a pool of worker processes.
+
+        If the pool can't be started or a worker dies, stops after the last range
+        that completed, leaving the rest to the sequential loop in update().
+
+        Args:
+            end: Byte offset to stop at
+
+        Returns:
+            Number of lines indexed
+        """
+        start = self.log_file.get_position()
+        workers = os.cpu_count() or 1
+        step = (end - start) // workers
+
+        # Split into roughly equal ranges, each moved forward to the next line start
+        boundaries = [start]
+        with open(self.path, "rb") as f:
+            for i in range(1, workers):
+                f.seek(max(start + i * step, boundaries[-1]))
+                f.readline()
+                boundaries.append(min(f.tell(), end))
+        boundaries.append(end)
+
+        lines_indexed = 0
+        position = start
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_scan_range, self.path, lo, hi)
+                    for lo, hi in zip(boundaries, boundaries[1:])
+                    if lo < hi
+                ]
+                # Results must be appended in file order
+                for future in futures:
+                    positions, widths, position = future.result()
+                    self._index_lines(positions, widths)
+                    lines_indexed += len(positions)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Parallel indexing stopped at {position:,}, continuing sequentially: {e}")
+
+        # The last range may have run past end to finish a line that was still being written
+        self.log_file.seek_to(position)
+        return lines_indexed
+
     async def _acheck_and_handle_truncation(self, current_size: int, current_position: int):
         """Async version: Check for file truncation and rebuild index if needed."""
         if current_size < current_position:
@@ -414,37 +556,89 @@ class LogLogLog:
             # Reset position to start over
             self.log_file.seek_to(0)
 
-    def _process_lines_sync(self, time_budget: float) -> int:
+    def _scan_lines_sync(self, time_budget: float) -> Tuple[List[int], List[int]]:
         """
-        Process lines synchronously for a time budget.
+        Scan lines for a time budget without adding them to the index.
+
+        Only reads the log file, so it is safe to run in a worker thread while
+        the event loop keeps serving reads from the index.
 
         Args:
-            time_budget: Maximum time in seconds to spend processing
+            time_budget: Maximum time in seconds to spend scanning
 
         Returns:
-            Number of lines processed
+            Tuple of (positions, widths) for the lines scanned, empty at EOF
         """
         start_time = time.time()
-        lines_processed = 0
+        positions, widths = [], []
 
-        while True:
-            # Check time budget
-            if time.time() - start_time >= time_budget:
-                break
+        # Small chunks so the time budget is checked often enough for the UI
+        while time.time() - start_time < time_budget:
+            chunk_positions, chunk_widths = self._scan_chunk(ASYNC_CHUNK_SIZE)
+            if not chunk_positions:
+                break  # EOF
+            positions += chunk_positions
+            widths += chunk_widths
 
-            # Get raw byte position before reading line
-            raw_pos = self.log_file.get_position()
-            line = self.log_file.read_line()
+        return positions, widths
 
-            if line is None:
-                break  # EOF
+    def _index_chunk(self, chunk_size: int = READ_CHUNK_SIZE) -> int:
+        """
+        Read the next chunk of lines from the log file and add them to the index.
+
+        Args:
+            chunk_size: Approximate number of bytes to read
+
+        Returns:
+            Number of lines indexed, 0 at EOF
+        """
+        positions, widths = self._scan_chunk(chunk_size)
+        self._index_lines(positions, widths)
+        return len(positions)
 
-            # Calculate width and add to index
-            width = self.get_width(line)
-            self._line_index.append_line(raw_pos, width)
-            lines_processed += 1
+    def _index_lines(self, positions: List[int], widths: List[int]):
+        """Add scanned lines to the index, invalidating cached totals."""
+        if positions:
+            self._line_index.append_lines(positions, widths)
+            self._version += 1
 
-        return lines_processed
+    def _scan_chunk(self, chunk_size: int = READ_CHUNK_SIZE) -> Tuple[List[int], List[int]]:
+        """
+        Read the next chunk of lines from the log file and measure them.
+
+        Args:
+            chunk_size: Approximate number of bytes to read
+
+        Returns:
+            Tuple of (positions, widths) for the chunk's lines, empty at EOF
+        """
+        raw_pos = self.log_file.get_position()
+        chunk = self.log_file.read_chunk(chunk_size)
+        lines = split_chunk(chunk)
+        if not lines:
+            return [], []
+
+        # Each line starts just past the previous line and its newline
+        lengths = list(map(len, lines))
+        positions = list(accumulate([length + 1 for length in lengths[:-1]], initial=raw_pos))
+
+        # A memchr-speed search lets LF-only chunks skip the per-line strip
+        has_carriage_returns = b"\r" in chunk
+        if has_carriage_returns:
+            lines = strip_carriage_returns(lines)
+
+        # Calculate widths for the whole batch, decoding only if a custom width function needs text.
+        # For ASCII, both the default and plain len() widths are byte lengths; one word-at-a-time
+        # scan over the whole chunk covers that common case
+        get_width = self.get_width
+        if (get_width is default_get_width or get_width is len) and chunk.isascii():
+            widths = list(map(len, lines)) if has_carriage_returns else lengths
+        elif get_width is default_get_width:
+            widths = default_get_widths(lines)
+        else:
+            widths = [self.get_width(line.decode("utf-8", errors="replace")) for line in lines]
+
+        return positions, widths
 
     async def aupdate(self, progress_callback=None, progress_interval=0.1):
         """Async version of update() method for non-blocking file processing.
@@ -479,15 +673,18 @@ class LogLogLog:
 
         # File is already open from __init__
         while True:
-            # Process a chunk of lines synchronously (blocking, but time-boxed)
-            lines_processed = self._process_lines_sync(time_budget)
+            # Read and measure a time-boxed batch off the event loop, then index it here
+            # so the index is only ever mutated on the loop that reads from it
+            positions, widths = await asyncio.to_thread(self._scan_lines_sync, time_budget)
+            self._index_lines(positions, widths)
+            lines_processed = len(positions)
             total_lines += lines_processed
 
             if lines_processed == 0:
                 break  # EOF
 
-            # Progress logging for large files
-            if total_lines % 100000 == 0:
+            # Progress logging for large files, once per 100k lines crossed
+            if total_lines // 100000 > (total_lines - lines_processed) // 100000:
                 elapsed = time.time() - process_start
                 rate = total_lines / elapsed if elapsed > 0 else 0
                 logger.info(f"Processed {total_lines:,} lines in {elapsed:.1f}s ({rate:.0f} lines/sec)")
@@ -507,9 +704,9 @@ class LogLogLog:
             # No tree update needed - summaries are created automatically during append
             # LineIndex handles flushing internally
 
-        # Save current file size to cache metadata (run in thread for I/O)
-        current_file_size = await self.log_file.aget_size()
-        await asyncio.to_thread(self._save_file_size, current_file_size)
+        # Save the size seen before indexing rather than stat again (see update()),
+        # too small a write to be worth a thread
+        self._save_file_size(current_size)
 
         logger.info(f"Total async update time: {time.time() - start_time:.3f}s")
 
@@ -523,38 +720,25 @@ class LogLogLog:
         Raises:
             IOError: If LogFile was opened in read-only mode
         """
-        # Get position before append
-        raw_pos = self.log_file.get_size()
-
-        # Write to file using LogFile
-        self.log_file.append_line(line)
+        # Write to file using LogFile, which reports where the line landed
+        raw_pos = self.log_file.append_line(line)
 
         # Update index
         width = self.get_width(line)
         self._line_index.append_line(raw_pos, width)
-
-        # Update file stats
-        self._file_stat = os.stat(self.path)
+        self._version += 1
 
     def __getitem__(self, line_no: int) -> str:
         """Get a logical line by line number."""
-        total_lines = len(self._line_index)
-
         # Handle negative indexing
         if line_no < 0:
-            line_no = total_lines + line_no
+            line_no += len(self._line_index)
 
-        if line_no < 0 or line_no >= total_lines:
-            raise IndexError(f"Line {line_no} out of range")
-
-        # O(1) access using line offset index
+        # O(1) access using line offset index, which raises IndexError when out of range
         offset = self._line_index.get_line_position(line_no)
 
-        # Save current position, seek to line, read it, restore position
-        saved_position = self.log_file.get_position()
-        self.log_file.seek_to(offset)
-        line = self.log_file.read_line()
-        self.log_file.seek_to(saved_position)
+        # Positional read, so the indexing position is left alone
+        line = self.log_file.read_line_at(offset)
 
         return line if line is not None else ""
 
@@ -564,8 +748,27 @@ class LogLogLog:
 
     def __iter__(self) -> Iterator[str]:
         """Iterate over all logical lines."""
-        for i in range(len(self)):
-            yield self[i]
+        return self._iter_lines(0)
+
+    def _iter_lines(self, line_no: int) -> Iterator[str]:
+        """
+        Iterate over logical lines from line_no to the end of the log.
+
+        Reads batches of consecutive lines with one positional read each,
+        rather than one read per line. Batches stop growing once they span
+        READ_CHUNK_SIZE bytes, so long lines don't make for huge reads.
+        """
+        line_count = len(self)
+        get_position = self._line_index.get_line_position
+        batch_size = 16
+        while line_no < line_count:
+            batch_end = min(line_no + batch_size, line_count)
+            positions = [get_position(i) for i in range(line_no, batch_end)]
+            for line in self.log_file.read_lines_at(positions):
+                yield line if line is not None else ""
+            line_no = batch_end
+            if positions[-1] - positions[0] < READ_CHUNK_SIZE:
+                batch_size = min(batch_size * 2, ITER_BATCH_LINES)
 
     def width(self, width: int) -> WidthView:
         """
@@ -644,4 +847,10 @@ class LogLogLog:
         Returns:
             Total display rows
         """
-        return self._line_index.get_total_display_rows(width)
+        # Summing summaries is linear in the log size, so reuse it until the index changes
+        cached = self._total_rows_cache.get(width)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        total = self._line_index.get_total_display_rows(width)
+        self._total_rows_cache[width] = (self._version, total)
+        return total
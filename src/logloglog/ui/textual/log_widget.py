@@ -7,7 +7,6 @@ from textual.geometry import Size
 from textual.message import Message
 from textual.binding import Binding
 from rich.segment import Segment
-from rich.markup import escape
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -52,6 +51,7 @@ class LogWidget(ScrollView):
         self._refresh_task = None
         self._auto_refresh_enabled = True
         self._at_bottom = True  # Track if we're scrolled to the bottom
+        self._set_width_pending = False  # A queued set_width() call, see _schedule_set_width()
 
         # Handle both LogLogLog instances and file paths
         if isinstance(log_data_or_path, (str, Path)):
@@ -104,12 +104,17 @@ class LogWidget(ScrollView):
 
     def set_width(self, width: int):
         """Update the view width and preserve scroll position."""
+        width_changed = self.current_width != width
+
+        # Periodic refreshes call this with the same width; skip them unless the log grew or shrank
+        if not width_changed and self.log_view is not None and len(self.log_view) == self.virtual_size.height:
+            return
+
         # Check if we're at bottom before update
         was_at_bottom = self._at_bottom
 
         # Remember current scroll position as a logical line (only if width is changing)
         old_logical_line = None
-        width_changed = self.current_width != width
 
         if width_changed and self.log_view and self.current_width > 0 and len(self.log_view) > 0 and not was_at_bottom:
             try:
@@ -119,8 +124,9 @@ class LogWidget(ScrollView):
             except (IndexError, Exception):
                 pass  # If something fails, just don't preserve position
 
-        # Update the view
-        self.log_view = self.log_data.width(width)
+        # Update the view, keeping the old one and its caches if only the length changed
+        if width_changed or self.log_view is None:
+            self.log_view = self.log_data.width(width)
         self.virtual_size = Size(width, len(self.log_view))
         self.current_width = width
 
@@ -138,6 +144,18 @@ class LogWidget(ScrollView):
 
         self.refresh()
 
+    def _schedule_set_width(self):
+        """Queue a set_width() at the current width, folding repeat requests into one call."""
+        if self._set_width_pending or self.current_width <= 0:
+            return
+        self._set_width_pending = True
+        self.call_later(self._apply_scheduled_width)
+
+    def _apply_scheduled_width(self):
+        """Run the set_width() queued by _schedule_set_width()."""
+        self._set_width_pending = False
+        self.set_width(self.current_width)
+
     def _post_log_updated(self):
         """Post a LogUpdated message with current state."""
         if self.log_view is not None:
@@ -169,7 +187,8 @@ class LogWidget(ScrollView):
 
         try:
             line_text = self.log_view[line_index]
-            return Strip([Segment(escape(line_text))])
+            # Segment text is literal, not markup, so it needs no escaping
+            return Strip([Segment(line_text)])
         except IndexError:
             return Strip.blank(self.size.width)
 
@@ -209,11 +228,7 @@ class LogWidget(ScrollView):
         """Background task that periodically checks for log updates."""
         logger.debug("Auto-refresh loop started")
         try:
-            logger.debug(
-                f"Loop conditions: auto_refresh_enabled={self._auto_refresh_enabled}, is_mounted={self.is_mounted}"
-            )
             while self._auto_refresh_enabled and self.is_mounted:
-                logger.debug("Auto-refresh loop iteration starting")
                 await self.arefresh_log_data()
 
                 # Update display after each refresh iteration
@@ -222,10 +237,8 @@ class LogWidget(ScrollView):
                     if self.current_width == 0 and self.size.width > 0:
                         self.current_width = self.size.width
 
-                    if self.current_width > 0:
-                        self.call_later(self.set_width, self.current_width)
+                    self._schedule_set_width()
 
-                logger.debug(f"Auto-refresh complete, sleeping for {interval}s")
                 await asyncio.sleep(interval)
         except asyncio.CancelledError:
             logger.debug("Auto-refresh loop cancelled")
@@ -244,27 +257,24 @@ class LogWidget(ScrollView):
                 from logloglog import LogLogLog
 
                 logger.debug(f"Creating deferred LogLogLog for {self._log_path}")
-                self.log_data = LogLogLog(self._log_path, defer_indexing=True)
-                logger.debug(f"LogLogLog created successfully, self.log_data = {self.log_data}")
-                logger.debug(f"Type of self.log_data: {type(self.log_data)}")
-                logger.debug(f"Bool of self.log_data: {bool(self.log_data)}")
+                # Opening touches the filesystem (cache dir, symlink, file handle), so keep it off the UI thread
+                self.log_data = await asyncio.to_thread(LogLogLog, self._log_path, defer_indexing=True)
 
             # Skip if still no log data object
             if self.log_data is None:
                 logger.debug("arefresh_log_data: no log data object, skipping")
                 return
 
-            logger.debug(f"Proceeding with refresh, log_data exists: {type(self.log_data)}")
-
             # Create progress callback for UI updates during indexing
             async def on_progress():
-                if self.current_width > 0:
-                    self.call_later(self.set_width, self.current_width)
+                self._schedule_set_width()
 
             # Update log data with progress callback
             await self.log_data.aupdate(progress_callback=on_progress, progress_interval=0.016)
 
-            logger.debug(f"Data update complete, LogLogLog has {len(self.log_data)} lines")
+            # This runs every refresh, so don't build the message unless it will be logged
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Data update complete, LogLogLog has {len(self.log_data)} lines")
 
             # Set initial width if not set yet
             if self.current_width == 0 and self.size.width > 0:
@@ -1,6 +1,8 @@
 """WidthView class for viewing logs at a specific terminal width."""
 
-from typing import Iterator, Tuple, TYPE_CHECKING
+from typing import Iterator, List, Tuple, TYPE_CHECKING
+
+from .line_index import MAX_WIDTH
 
 if TYPE_CHECKING:
     from .logloglog import LogLogLog
@@ -20,6 +22,12 @@ class WidthView:
         self._logloglog = logloglog
         self._width = width
         self._cached_length = None
+        self._cached_length_version = None  # LogLogLog._version the length was computed at
+        # Last line read by __getitem__, reused while stepping through its wrapped rows
+        self._last_line_key = None  # (version, line_no)
+        self._last_line = ""
+        # Where the last row lookup landed, so the next row down needs no search
+        self._cursor = None  # (version, row, line_no, line_offset, line_rows)
 
     def line_at(self, row: int) -> Tuple[int, int]:
         """
@@ -67,32 +75,101 @@ class WidthView:
         Raises:
             IndexError: If row_no is out of bounds
         """
+        logloglog = self._logloglog
+        width = self._width
+        total_rows = len(self)
+
         # Handle negative indexing
         if row_no < 0:
-            row_no = len(self) + row_no
+            row_no = total_rows + row_no
 
-        if row_no < 0 or row_no >= len(self):
+        if row_no < 0 or row_no >= total_rows:
             raise IndexError(f"Display row {row_no} out of range")
 
-        # Find the logical line and position within it
-        line_no, line_offset = self.line_at(row_no)
+        # Find the logical line and position within it, stepping on from the last row if adjacent
+        version = logloglog._version
+        cursor = self._cursor
+        if cursor is not None and cursor[0] == version and 0 <= row_no - cursor[1] <= 1:
+            _, cursor_row, line_no, line_offset, line_rows = cursor
+            if row_no != cursor_row:
+                line_offset += 1
+                if line_offset == line_rows:
+                    line_no += 1
+                    line_offset = 0
+                    line_rows = self._line_rows(line_no)
+        else:
+            line_no, line_offset = logloglog.line_at_row(row_no, width)
+            line_rows = self._line_rows(line_no)
+        self._cursor = (version, row_no, line_no, line_offset, line_rows)
 
         # Get the line and calculate the wrapped portion
-        line = self._logloglog[line_no]
-
-        # Calculate start and end positions for this display row
-        start_pos = line_offset * self._width
-        end_pos = min(start_pos + self._width, len(line))
-
-        return line[start_pos:end_pos]
+        line_key = (version, line_no)
+        if line_key == self._last_line_key:
+            line = self._last_line
+        else:
+            line = logloglog[line_no]
+            self._last_line_key = line_key
+            self._last_line = line
+
+        # Slicing clamps to the end of the line for the last wrapped row
+        start_pos = line_offset * width
+        return line[start_pos : start_pos + width]
+
+    def _line_rows(self, line_no: int) -> int:
+        """Get how many display rows a logical line wraps to at this width."""
+        # Row counts come from the index, which caps widths the same way
+        row_width = min(self._width, MAX_WIDTH)
+        line_width = self._logloglog._line_index.get_line_width(line_no)
+        return (line_width + row_width - 1) // row_width or 1
 
     def __len__(self) -> int:
         """Get total number of display rows."""
-        if self._cached_length is None:
+        version = self._logloglog._version
+        if self._cached_length_version != version:
             self._cached_length = self._logloglog.total_rows(self._width)
+            self._cached_length_version = version
         return self._cached_length
 
+    def get_rows(self, start: int, stop: int) -> List[str]:
+        """
+        Get the text of a range of display rows.
+
+        Finds the first row once then walks lines forward, so each logical
+        line is read once however many of the rows it wraps to.
+
+        Args:
+            start: First display row (negative indexing supported)
+            stop: Display row to stop before, clamped to the end of the view
+
+        Returns:
+            Text of rows start to stop - 1, like view[start:stop] on a list
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+        line_no, line_offset = self._logloglog.line_at_row(start, self._width)
+        return list(self._iter_rows(line_no, line_offset, stop - start))
+
     def __iter__(self) -> Iterator[str]:
-        """Iterate over display rows."""
-        for i in range(len(self)):
-            yield self[i]
+        """
+        Iterate over display rows.
+
+        Walks lines in order rather than looking up each row, reading every
+        logical line once however many rows it wraps to.
+        """
+        return self._iter_rows(0, 0, len(self))
+
+    def _iter_rows(self, line_no: int, line_offset: int, remaining: int) -> Iterator[str]:
+        """Yield remaining display rows, starting line_offset rows into line line_no."""
+        if remaining <= 0:
+            return
+        width = self._width
+        for line in self._logloglog._iter_lines(line_no):
+            rows = min(self._line_rows(line_no) - line_offset, remaining)
+            for start_pos in range(line_offset * width, (line_offset + rows) * width, width):
+                yield line[start_pos : start_pos + width]
+            remaining -= rows
+            if remaining <= 0:
+                return
+            line_no += 1
+            line_offset = 0
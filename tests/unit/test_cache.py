@@ -1,7 +1,5 @@
 """Tests for cache module."""
 
-import os
-import tempfile
 import pytest
 from pathlib import Path
 
@@ -9,21 +7,19 @@ from logloglog.cache import Cache, CACHE_DIR, TMP_DIR
 
 
 @pytest.fixture
-def temp_cache_dir():
+def temp_cache_dir(tmp_path):
     """Create a temporary cache directory."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    return cache_dir
 
 
 @pytest.fixture
-def temp_log_file():
-    """Create a temporary log file."""
-    fd, path = tempfile.mkstemp(suffix=".log")
-    os.close(fd)
-    log_path = Path(path)
+def temp_log_file(tmp_path):
+    """Create a temporary log file beside the cache directory."""
+    log_path = tmp_path / "test.log"
     log_path.write_text("test log content\n")
-    yield log_path
-    log_path.unlink(missing_ok=True)
+    return log_path
 
 
 def test_cache_constants():
@@ -83,27 +79,20 @@ def test_get_dir_consistent_hash(temp_cache_dir, temp_log_file):
     assert cache_path1 == cache_path2
 
 
-def test_get_dir_different_files_different_dirs(temp_cache_dir):
+def test_get_dir_different_files_different_dirs(temp_cache_dir, tmp_path):
     """Test that different files get different cache directories."""
     cache = Cache(temp_cache_dir)
 
     # Create two different log files
-    with tempfile.NamedTemporaryFile(suffix=".log", delete=False) as f1:
-        f1.write(b"content1\n")
-        log1 = Path(f1.name)
-
-    with tempfile.NamedTemporaryFile(suffix=".log", delete=False) as f2:
-        f2.write(b"content2\n")
-        log2 = Path(f2.name)
-
-    try:
-        cache_path1 = cache.get_dir(log1)
-        cache_path2 = cache.get_dir(log2)
-
-        assert cache_path1 != cache_path2
-    finally:
-        log1.unlink()
-        log2.unlink()
+    log1 = tmp_path / "one.log"
+    log1.write_bytes(b"content1\n")
+    log2 = tmp_path / "two.log"
+    log2.write_bytes(b"content2\n")
+
+    cache_path1 = cache.get_dir(log1)
+    cache_path2 = cache.get_dir(log2)
+
+    assert cache_path1 != cache_path2
 
 
 def test_get_dir_nonexistent_file(temp_cache_dir):
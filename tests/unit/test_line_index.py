@@ -1,16 +1,24 @@
 """Tests for LineIndex."""
 
+import os
 import pytest
-import tempfile
-from pathlib import Path
-from logloglog.line_index import LineIndex, MAX_WIDTH, SUMMARY_INTERVAL
+from logloglog.line_index import LineIndex, MAX_WIDTH, SUMMARY_INTERVAL, count_rows, summarize_widths
 
 
 @pytest.fixture
-def temp_index_dir():
+def temp_index_dir(tmp_path):
     """Create a temporary directory for index files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def three_line_index(tmp_path_factory):
+    """Read-only index of lines taking 1, 2 and 3 rows at width 80, shared by the module."""
+    index = LineIndex(tmp_path_factory.mktemp("three_line_index"))
+    index.open(create=True)
+    index.append_lines([0, 100, 200], [10, 100, 240])
+    yield index
+    index.close()
 
 
 def test_line_index_creation(temp_index_dir):
@@ -45,33 +53,19 @@ def test_append_lines(temp_index_dir):
     index.close()
 
 
-def test_total_display_rows(temp_index_dir):
+def test_total_display_rows(three_line_index):
     """Test calculating total display rows."""
-    index = LineIndex(temp_index_dir)
-    index.open(create=True)
-
-    # Add lines with different widths
-    index.append_line(0, 10)  # 1 row at width 80
-    index.append_line(100, 100)  # 2 rows at width 80
-    index.append_line(200, 240)  # 3 rows at width 80
+    index = three_line_index
 
     # Test different terminal widths
     assert index.get_total_display_rows(80) == 6  # 1 + 2 + 3
     assert index.get_total_display_rows(40) == 10  # 1 + 3 + 6
     assert index.get_total_display_rows(20) == 18  # 1 + 5 + 12
 
-    index.close()
-
 
-def test_display_row_for_line(temp_index_dir):
+def test_display_row_for_line(three_line_index):
     """Test getting display row for logical line."""
-    index = LineIndex(temp_index_dir)
-    index.open(create=True)
-
-    # Add lines
-    index.append_line(0, 10)  # 1 row at width 80
-    index.append_line(100, 100)  # 2 rows at width 80
-    index.append_line(200, 240)  # 3 rows at width 80
+    index = three_line_index
 
     # At width 80
     assert index.get_display_row_for_line(0, 80) == 0
@@ -83,18 +77,10 @@ def test_display_row_for_line(temp_index_dir):
     assert index.get_display_row_for_line(1, 40) == 1  # After 1 row
     assert index.get_display_row_for_line(2, 40) == 4  # After 1 + 3 rows
 
-    index.close()
 
-
-def test_line_for_display_row(temp_index_dir):
+def test_line_for_display_row(three_line_index):
     """Test finding logical line for display row."""
-    index = LineIndex(temp_index_dir)
-    index.open(create=True)
-
-    # Add lines
-    index.append_line(0, 10)  # 1 row at width 80
-    index.append_line(100, 100)  # 2 rows at width 80
-    index.append_line(200, 240)  # 3 rows at width 80
+    index = three_line_index
 
     # At width 80
     assert index.get_line_for_display_row(0, 80) == (0, 0)
@@ -108,8 +94,6 @@ def test_line_for_display_row(temp_index_dir):
     with pytest.raises(IndexError):
         index.get_line_for_display_row(6, 80)
 
-    index.close()
-
 
 def test_summary_creation(temp_index_dir):
     """Test that summaries are created every SUMMARY_INTERVAL lines."""
@@ -158,6 +142,28 @@ def test_reopen_existing_index(temp_index_dir):
     index2.close()
 
 
+def test_reopen_existing_index_bulk(temp_index_dir):
+    """Test reopening an index written in one bulk append across many blocks."""
+    count = SUMMARY_INTERVAL * 10 + 7
+    positions = list(range(0, count * 10, 10))
+    widths = [i % 300 for i in range(count)]
+
+    index = LineIndex(temp_index_dir)
+    index.open(create=True)
+    index.append_lines(positions, widths)
+    index.close()
+
+    index2 = LineIndex(temp_index_dir)
+    index2.open(create=False)
+
+    assert len(index2) == count
+    assert [index2.get_line_position(i) for i in range(count)] == positions
+    assert [index2.get_line_width(i) for i in range(count)] == widths
+    assert len(index2._summaries) == MAX_WIDTH * 10
+
+    index2.close()
+
+
 def test_edge_cases(temp_index_dir):
     """Test edge cases."""
     index = LineIndex(temp_index_dir)
@@ -223,8 +229,8 @@ def test_line_index_summary_edge_cases(temp_index_dir):
     index.open(create=True)
 
     # Add lines to create partial summary blocks
-    for i in range(SUMMARY_INTERVAL + 500):  # 1500 lines, creates 1 complete + 1 partial summary
-        index.append_line(i * 100, i % 50 + 1)  # Varying widths 1-50
+    count = SUMMARY_INTERVAL + 500  # 1500 lines, creates 1 complete + 1 partial summary
+    index.append_lines([i * 100 for i in range(count)], [i % 50 + 1 for i in range(count)])  # Varying widths 1-50
 
     # Test calculations that cross summary boundaries
     total_rows = index.get_total_display_rows(25)
@@ -251,14 +257,11 @@ def test_line_index_empty_lines_in_summary(temp_index_dir):
     index = LineIndex(temp_index_dir)
     index.open(create=True)
 
-    # Add a mix of empty and non-empty lines to create a summary
-    for i in range(SUMMARY_INTERVAL):
-        if i % 3 == 0:
-            # Empty line - should always take 1 row
-            index.append_line(i * 100, 0)
-        else:
-            # Non-empty line with width 50 (wraps at narrower widths)
-            index.append_line(i * 100, 50)
+    # Add a mix of empty and non-empty lines to create a summary: every third line is
+    # empty (should always take 1 row), the rest width 50 (wraps at narrower widths)
+    index.append_lines(
+        [i * 100 for i in range(SUMMARY_INTERVAL)], [0 if i % 3 == 0 else 50 for i in range(SUMMARY_INTERVAL)]
+    )
 
     # Verify summary was created
     assert len(index._summaries) == MAX_WIDTH
@@ -306,8 +309,7 @@ def test_line_index_binary_search_edge_case(temp_index_dir):
     index.open(create=True)
 
     # Create exactly SUMMARY_INTERVAL lines for one complete summary
-    for i in range(SUMMARY_INTERVAL):
-        index.append_line(i * 100, 10)  # All lines width 10
+    index.append_lines([i * 100 for i in range(SUMMARY_INTERVAL)], [10] * SUMMARY_INTERVAL)  # All lines width 10
 
     # Add one more line to start incomplete block
     index.append_line(SUMMARY_INTERVAL * 100, 10)
@@ -351,3 +353,179 @@ def test_line_index_zero_width_display_row(temp_index_dir):
     assert row == 0
 
     index.close()
+
+
+def test_reads_span_flushed_and_pending(temp_index_dir):
+    """Test lookups that cross from flushed (mmap) data into the pending batch."""
+    index = LineIndex(temp_index_dir)
+    index.open(create=True)
+
+    # One full flushed block plus a partial pending one
+    for i in range(SUMMARY_INTERVAL + 10):
+        index.append_line(i * 100, 100 if i >= SUMMARY_INTERVAL - 5 else 10)
+
+    assert index.get_line_position(SUMMARY_INTERVAL - 1) == (SUMMARY_INTERVAL - 1) * 100
+    assert index.get_line_position(SUMMARY_INTERVAL + 9) == (SUMMARY_INTERVAL + 9) * 100
+    assert index.get_line_width(SUMMARY_INTERVAL + 9) == 100
+
+    # At width 50, the last 15 lines take 2 rows each
+    assert index.get_total_display_rows(50) == SUMMARY_INTERVAL - 5 + 15 * 2
+    assert index.get_line_for_display_row(SUMMARY_INTERVAL - 5 + 11, 50) == (SUMMARY_INTERVAL, 1)
+
+    # Appending more after reads must still be able to grow the arrays, in one bulk extension
+    index.append_lines(list(range(SUMMARY_INTERVAL)), [1] * SUMMARY_INTERVAL)
+    assert len(index) == 2 * SUMMARY_INTERVAL + 10
+
+    index.close()
+
+
+def test_summarize_widths_matches_ceiling_division():
+    """Test summary totals against direct per-width ceiling division."""
+    width_counts = {0: 7, 1: 3, 2: 1, 79: 4, 80: 2, 81: 5, 511: 1, 512: 2, 513: 1, 65535: 3}
+
+    totals = summarize_widths(width_counts)
+
+    assert len(totals) == MAX_WIDTH
+    for term_width in range(1, MAX_WIDTH + 1):
+        expected = sum(
+            (max(1, (line_width + term_width - 1) // term_width)) * count for line_width, count in width_counts.items()
+        )
+        assert totals[term_width - 1] == expected
+
+
+def test_append_lines_matches_append_line(temp_index_dir):
+    """Test that a bulk append builds the same index as per-line appends."""
+    count = SUMMARY_INTERVAL * 2 + 250
+    positions = [i * 100 for i in range(count)]
+    widths = [(i * 37) % 300 for i in range(count)]
+    widths[5] = 100000  # Capped like append_line
+
+    single = LineIndex(temp_index_dir / "single")
+    single.open(create=True)
+    for position, width in zip(positions, widths):
+        single.append_line(position, width)
+
+    bulk = LineIndex(temp_index_dir / "bulk")
+    bulk.open(create=True)
+    bulk.append_line(positions[0], widths[0])  # Start mid-block
+    bulk.append_lines(positions[1:700], widths[1:700])
+    bulk.append_lines(positions[700:], widths[700:])
+
+    assert len(bulk) == len(single) == count
+    assert bulk.get_line_width(5) == 65535
+    assert list(bulk._summaries) == list(single._summaries)
+    for width in (1, 40, 80, MAX_WIDTH):
+        assert bulk.get_total_display_rows(width) == single.get_total_display_rows(width)
+    assert bulk.get_line_position(count - 1) == positions[-1]
+
+    single.close()
+    bulk.close()
+
+
+def test_count_rows_matches_per_line_division():
+    """Test counting rows by distinct width against per-line ceiling division."""
+    line_widths = [0, 1, 80, 80, 81, 160, 0, 1000, 80]
+
+    for term_width in (1, 7, 80, 512):
+        expected = sum(max(1, (line_width + term_width - 1) // term_width) for line_width in line_widths)
+        assert count_rows(line_widths, term_width) == expected
+
+
+def test_block_rows_cache_cleared_on_reopen(temp_index_dir):
+    """Test that cached block row totals don't survive recreating the index."""
+    index = LineIndex(temp_index_dir)
+    index.open(create=True)
+    index.append_lines(list(range(SUMMARY_INTERVAL)), [10] * SUMMARY_INTERVAL)
+
+    # Looked up twice so the second lookup comes from the cache
+    assert index.get_line_for_display_row(SUMMARY_INTERVAL - 1, 5) == (SUMMARY_INTERVAL // 2 - 1, 1)
+    assert index.get_line_for_display_row(SUMMARY_INTERVAL - 1, 5) == (SUMMARY_INTERVAL // 2 - 1, 1)
+
+    index.close()
+    index.open(create=True)
+    index.append_lines(list(range(SUMMARY_INTERVAL)), [1] * SUMMARY_INTERVAL)
+    assert index.get_line_for_display_row(SUMMARY_INTERVAL - 1, 5) == (SUMMARY_INTERVAL - 1, 0)
+
+    index.close()
+
+
+def test_partial_block_counts_survive_reopen(temp_index_dir):
+    """Test that a block started before reopening gets a correct summary."""
+    index = LineIndex(temp_index_dir / "reopened")
+    index.open(create=True)
+    index.append_lines(list(range(500)), [200] * 500)
+    index.close()
+
+    index = LineIndex(temp_index_dir / "reopened")
+    index.open()
+    index.append_lines(list(range(500)), [1] * 500)
+
+    # 500 lines of 20 rows and 500 of 1 row, all from the stored summary
+    assert index.get_total_display_rows(10) == 500 * 20 + 500
+
+    # Recreating the index starts the block from scratch
+    index.close()
+    index.open(create=True)
+    index.append_lines(list(range(SUMMARY_INTERVAL)), [1] * SUMMARY_INTERVAL)
+    assert index.get_total_display_rows(10) == SUMMARY_INTERVAL
+
+    index.close()
+
+
+def test_summary_totals_follow_growth(temp_index_dir):
+    """Test that cached per-width summary totals pick up newly added blocks."""
+    index = LineIndex(temp_index_dir)
+    index.open(create=True)
+
+    widths = []
+    for block in range(3):
+        block_widths = [(block * 31 + i * 7) % 200 for i in range(SUMMARY_INTERVAL + 100)]
+        index.append_lines(list(range(len(block_widths))), block_widths)
+        widths += block_widths
+
+        for width in (1, 33, 80):
+            assert index.get_total_display_rows(width) == count_rows(widths, width)
+            assert index.get_display_row_for_line(len(widths) - 1, width) == count_rows(widths[:-1], width)
+
+    index.close()
+
+
+def test_close_trims_grown_index_files(temp_index_dir):
+    """Test that over-allocated index files are trimmed back on close."""
+    index = LineIndex(temp_index_dir)
+    index.open(create=True)
+    count = SUMMARY_INTERVAL * 20 + 3
+    index.append_lines(list(range(count)), [1] * count)
+    index.close()
+
+    header_size = 32
+    assert (temp_index_dir / "positions.dat").stat().st_size == header_size + count * 8
+    assert (temp_index_dir / "widths.dat").stat().st_size == header_size + count * 2
+
+    index.open()
+    assert len(index) == count
+    assert index.get_line_position(count - 1) == count - 1
+    index.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fallocate"), reason="needs posix_fallocate")
+def test_grown_index_files_are_not_sparse(temp_index_dir):
+    """Test that growing an index file reserves its blocks rather than leaving a hole."""
+    # Some filesystems (ZFS, some tmpfs and overlay setups) don't support it, and the
+    # index is left sparse by design there
+    probe = temp_index_dir / "probe"
+    with open(probe, "wb") as f:
+        try:
+            os.posix_fallocate(f.fileno(), 0, 4096)
+        except OSError:
+            pytest.skip("filesystem doesn't support posix_fallocate")
+    probe.unlink()
+
+    index = LineIndex(temp_index_dir)
+    index.open(create=True)
+    count = SUMMARY_INTERVAL * 200
+    index.append_lines(list(range(count)), [1] * count)
+
+    stat = (temp_index_dir / "positions.dat").stat()
+    assert stat.st_blocks * 512 >= stat.st_size
+    index.close()
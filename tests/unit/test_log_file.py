@@ -0,0 +1,148 @@
+"""Tests for LogFile."""
+
+import pytest
+from logloglog.log_file import LINE_READ_SIZE, LogFile
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """Create a log file with mixed line endings and no final newline."""
+    path = tmp_path / "test.log"
+    path.write_bytes(b"first\r\nsecond\n\nfourth is longer\nlast")
+    return path
+
+
+def test_read_lines_bulk(log_path):
+    """Test reading all lines in a single bulk read."""
+    log_file = LogFile(log_path)
+    log_file.open()
+
+    lines = log_file.read_lines()
+    assert lines == [b"first\r", b"second", b"", b"fourth is longer", b"last"]
+    assert log_file.get_position() == log_path.stat().st_size
+    assert log_file.read_lines() == []
+
+    log_file.close()
+
+
+def test_read_lines_small_chunks_end_on_line_boundary(log_path):
+    """Test that small chunks are completed to the end of the current line."""
+    log_file = LogFile(log_path)
+    log_file.open()
+
+    lines = []
+    while batch := log_file.read_lines(chunk_size=3):
+        # Every batch resumes exactly at the start of a line
+        lines.extend(batch)
+
+    assert lines == [b"first\r", b"second", b"", b"fourth is longer", b"last"]
+
+    log_file.close()
+
+
+def test_read_chunk_then_read_line(log_path):
+    """Test that line reads carry on from where a chunk read stopped, and vice versa."""
+    log_file = LogFile(log_path)
+    log_file.open()
+
+    assert log_file.read_chunk(3) == b"first\r\n"
+    assert log_file.read_line() == "second"
+    assert log_file.read_chunk(1) == b"\n"
+    assert log_file.read_line() == "fourth is longer"
+    assert log_file.read_all_lines() == ["last"]
+    assert log_file.read_chunk() == b""
+
+    log_file.close()
+
+
+def test_read_lines_after_truncation(log_path):
+    """Test that reading past a truncated end returns nothing instead of faulting."""
+    log_file = LogFile(log_path)
+    log_file.open()
+
+    assert log_file.read_lines(chunk_size=3) == [b"first\r"]
+    log_path.write_bytes(b"")
+    assert log_file.read_lines() == []
+
+    log_file.close()
+
+
+def test_append_line_returns_offset(log_path):
+    """Test that append_line reports the byte offset the line was written at."""
+    log_file = LogFile(log_path, mode="a")
+    size = log_path.stat().st_size
+
+    assert log_file.append_line("appended") == size
+    assert log_file.append_line("again\n") == size + len("appended\n")
+
+
+def test_read_line_at(tmp_path):
+    """Test positional line reads, including lines longer than one read."""
+    long_line = "x" * (LINE_READ_SIZE * 2 + 7)
+    path = tmp_path / "test.log"
+    path.write_bytes(f"short\r\n{long_line}\n\nend".encode())
+
+    log_file = LogFile(path)
+    log_file.open()
+    log_file.seek_to(3)
+
+    assert log_file.read_line_at(0) == "short"
+    assert log_file.read_line_at(7) == long_line
+    assert log_file.read_line_at(8 + len(long_line)) == ""
+    assert log_file.read_line_at(9 + len(long_line)) == "end"
+    assert log_file.read_line_at(path.stat().st_size) is None
+
+    # Read position is untouched
+    assert log_file.get_position() == 3
+    assert log_file.read_line() == "rt"
+
+    log_file.close()
+
+
+def test_read_lines_at_matches_read_line_at(tmp_path):
+    """Test batched positional reads, including lines longer than one read and EOF."""
+    long_line = "x" * (LINE_READ_SIZE * 2 + 7)
+    path = tmp_path / "test.log"
+    path.write_bytes(f"short\r\n{long_line}\n\ncafé\nend".encode())
+    size = path.stat().st_size
+
+    log_file = LogFile(path)
+    log_file.open()
+    positions = [0, 7, 8 + len(long_line), 9 + len(long_line), size - 3, size]
+    assert log_file.read_lines_at(positions) == [log_file.read_line_at(p) for p in positions]
+    assert log_file.read_lines_at(positions)[-2:] == ["end", None]
+    assert log_file.read_lines_at([]) == []
+    log_file.close()
+
+
+def test_read_lines_at_caps_read_size(tmp_path, monkeypatch):
+    """Test that lines spread far apart are read in several bounded reads."""
+    import logloglog.log_file as log_file_module
+
+    monkeypatch.setattr(log_file_module, "READ_CHUNK_SIZE", 100)
+    path = tmp_path / "test.log"
+    lines = [f"{i:03d}" + "y" * 60 for i in range(20)]
+    path.write_text("\n".join(lines) + "\n")
+
+    log_file = LogFile(path)
+    log_file.open()
+    read_sizes = []
+    pread = log_file._pread
+    monkeypatch.setattr(log_file, "_pread", lambda size, position: read_sizes.append(size) or pread(size, position))
+
+    positions = [i * 64 for i in range(20)]
+    assert log_file.read_lines_at(positions) == lines
+    assert max(read_sizes) <= 100 + LINE_READ_SIZE
+    log_file.close()
+
+
+def test_append_line_after_external_write(tmp_path):
+    """Appends report the real end offset even if another writer appended."""
+    log_path = tmp_path / "appended.log"
+    log_file = LogFile(log_path, mode="a")
+    assert log_file.append_line("one") == 0
+    with open(log_path, "ab") as f:
+        f.write(b"external\n")
+    assert log_file.append_line("two") == 13
+    log_file.close()
+    assert log_path.read_bytes() == b"one\nexternal\ntwo\n"
@@ -1,108 +1,109 @@
 """Tests for LogLogLog functionality."""
 
-import tempfile
 import os
+import re
+import subprocess
+import sys
 import pytest
 from pathlib import Path
 from logloglog import LogLogLog
 from logloglog.cache import Cache
 
+# Canonical test log contents
+THREE_LINES = b"Line 1\nLine 2\nLine 3\n"
+SIMPLE_LINES = b"Hello world\nThis is line 2\nShort\nA very long line that should wrap at 80 characters and continue beyond that point"
+WRAPPED_LINES = b"x" * 40 + b"\n" + b"y" * 120 + b"\n" + b"z" * 200  # 1, 2 and 3 rows at width 80
 
-@pytest.fixture
-def temp_log_file():
-    """Create a temporary log file."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        yield f.name
-    os.unlink(f.name)
-
-
-@pytest.fixture
-def temp_cache_dir():
-    """Create a temporary cache directory."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
-
-
-@pytest.fixture
-def log_with_content(temp_cache_dir):
-    """Create a log file with test content."""
-    content = "Line 1\nLine 2\nLine 3\n"
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
 
+def append_lines(path, *lines):
+    """Append lines to a log file with a single write, as an external writer would."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
     try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        yield log
-        log.close()
+        os.write(fd, "".join(f"{line}\n" for line in lines).encode())
     finally:
-        os.unlink(log_path)
+        os.close(fd)
+
+
+@pytest.fixture(scope="session")
+def corpora(tmp_path_factory):
+    """Write the canonical read-only log files once, for tests that index them with their own cache."""
+    corpora_dir = tmp_path_factory.mktemp("corpora")
+    contents = {"simple": SIMPLE_LINES, "wrapped": WRAPPED_LINES, "single": b"Test line\n"}
+    paths = {}
+    for name, content in contents.items():
+        paths[name] = corpora_dir / f"{name}.log"
+        paths[name].write_bytes(content)
+    return paths
+
+
+@pytest.fixture(scope="module")
+def log_with_content(tmp_path_factory):
+    """Create a log file with test content, indexed once and shared by read-only tests."""
+    tmp_dir = tmp_path_factory.mktemp("log_with_content")
+    log_path = tmp_dir / "test.log"
+    log_path.write_bytes(THREE_LINES)
+
+    log = LogLogLog(log_path, cache=Cache(tmp_dir / "cache"))
+    yield log
+    log.close()
 
 
-def test_empty_log(temp_log_file, temp_cache_dir):
+def test_empty_log(tmp_path):
     """Test with empty log file."""
-    log = LogLogLog(temp_log_file, cache=Cache(temp_cache_dir))
+    log_path = tmp_path / "test.log"
+    log_path.touch()
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
     assert len(log) == 0
 
     # Test empty view
     view = log.width(80)
     assert len(view) == 0
+    assert list(view) == []
+    assert view.get_rows(0, 10) == []
+    with pytest.raises(IndexError):
+        _ = view[0]
     log.close()
 
 
-def test_truncated_logfile(temp_cache_dir):
+def test_truncated_logfile(tmp_path):
     """Test behavior when logfile is truncated after initial indexing."""
     # Create initial log file with content
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\nLine 3\nLine 4\nLine 5\n")
-        log_path = f.name
-
-    try:
-        # Open and index the log
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 5
-        log.close()
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\nLine 2\nLine 3\nLine 4\nLine 5\n")
 
-        # Truncate the file to smaller size
-        with open(log_path, "w") as f:
-            f.write("Line 1\nLine 2\n")
+    # Open and index the log
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 5
+    log.close()
 
-        # Reopen - should detect truncation and rebuild index
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 2
-        assert log[0] == "Line 1"
-        assert log[1] == "Line 2"
-        log.close()
+    # Truncate the file to smaller size
+    with open(log_path, "w") as f:
+        f.write("Line 1\nLine 2\n")
 
-    finally:
-        os.unlink(log_path)
+    # Reopen - should detect truncation and rebuild index
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 2
+    assert log[0] == "Line 1"
+    assert log[1] == "Line 2"
+    log.close()
 
 
-def test_simple_lines(temp_cache_dir):
+def test_simple_lines(corpora, tmp_path):
     """Test with simple text lines."""
-    content = "Hello world\nThis is line 2\nShort\nA very long line that should wrap at 80 characters and continue beyond that point"
+    log = LogLogLog(corpora["simple"], cache=Cache(tmp_path / "cache"))
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+    # Test basic access
+    assert len(log) == 4
+    assert log[0] == "Hello world"
+    assert log[1] == "This is line 2"
+    assert log[2] == "Short"
+    assert log[3].startswith("A very long line")
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-
-        # Test basic access
-        assert len(log) == 4
-        assert log[0] == "Hello world"
-        assert log[1] == "This is line 2"
-        assert log[2] == "Short"
-        assert log[3].startswith("A very long line")
-
-        # Test iteration
-        lines = list(log)
-        assert len(lines) == 4
+    # Test iteration
+    lines = list(log)
+    assert len(lines) == 4
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
 def test_iteration(log_with_content):
@@ -111,91 +112,93 @@ def test_iteration(log_with_content):
     assert lines == ["Line 1", "Line 2", "Line 3"]
 
 
-def test_append(temp_cache_dir):
-    """Test appending lines."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Initial line\n")
-        log_path = f.name
+def test_iteration_streams_batches(tmp_path):
+    """Test that iteration reads batches lazily and matches indexing across batch boundaries."""
+    from itertools import islice
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
+    lines = [f"Line {i} " + "x" * (i % 37) for i in range(3000)] + ["", "café", "last"]
+    log_path = tmp_path / "test.log"
+    log_path.write_text("\n".join(lines) + "\n")
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
 
-        assert len(log) == 1
-        assert log[0] == "Initial line"
+    for expected, got in zip(lines, log):
+        assert got == expected
+    assert sum(1 for _ in log) == len(lines)
+    assert list(islice(iter(log), 5)) == lines[:5]
+    assert list(log._iter_lines(2990)) == lines[2990:]
+    log.close()
 
-        # Append new lines
-        log.append("Second line")
-        log.append("Third line")
 
-        assert len(log) == 3
-        assert log[1] == "Second line"
-        assert log[2] == "Third line"
+def test_append(tmp_path):
+    """Test appending lines."""
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Initial line\n")
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
 
+    assert len(log) == 1
+    assert log[0] == "Initial line"
 
-def test_update(temp_cache_dir):
-    """Test updating with externally added lines."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\n")
-        log_path = f.name
+    # Append new lines
+    log.append("Second line")
+    log.append("Third line")
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 1
+    assert len(log) == 3
+    assert log[1] == "Second line"
+    assert log[2] == "Third line"
 
-        # Externally append to file
-        with open(log_path, "a") as f:
-            f.write("Line 2\nLine 3\n")
+    log.close()
 
-        # Update should pick up new lines
-        log.update()
-        assert len(log) == 3
-        assert log[1] == "Line 2"
-        assert log[2] == "Line 3"
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+def test_update(tmp_path):
+    """Test updating with externally added lines."""
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\n")
 
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 1
 
-def test_wrapped_view(temp_cache_dir):
-    """Test LogView with wrapping."""
-    # Create lines of known width
-    content = "x" * 40 + "\n" + "y" * 120 + "\n" + "z" * 200
+    # Externally append to file
+    append_lines(log_path, "Line 2", "Line 3")
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+    # Update should pick up new lines
+    log.update()
+    assert len(log) == 3
+    assert log[1] == "Line 2"
+    assert log[2] == "Line 3"
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
+    log.close()
 
-        # View at width 80
-        view = log.width(80)
 
-        # Line 0: 40 chars -> 1 display row
-        # Line 1: 120 chars -> 2 display rows (ceil(120/80) = 2)
-        # Line 2: 200 chars -> 3 display rows (ceil(200/80) = 3)
-        # Total: 6 display rows
-        assert len(view) == 6
+def test_wrapped_view(corpora, tmp_path):
+    """Test LogView with wrapping."""
+    # Lines of known width: 40, 120 and 200 characters
+    log = LogLogLog(corpora["wrapped"], cache=Cache(tmp_path / "cache"))
 
-        # Test accessing wrapped portions
-        assert view[0] == "x" * 40  # First line, full
-        assert view[1] == "y" * 80  # Second line, first part
-        assert view[2] == "y" * 40  # Second line, second part
-        assert view[3] == "z" * 80  # Third line, first part
-        assert view[4] == "z" * 80  # Third line, second part
-        assert view[5] == "z" * 40  # Third line, third part
+    # View at width 80
+    view = log.width(80)
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    # Line 0: 40 chars -> 1 display row
+    # Line 1: 120 chars -> 2 display rows (ceil(120/80) = 2)
+    # Line 2: 200 chars -> 3 display rows (ceil(200/80) = 3)
+    # Total: 6 display rows
+    assert len(view) == 6
+
+    # Test accessing wrapped portions
+    assert view.get_rows(0, len(view)) == [
+        "x" * 40,  # First line, full
+        "y" * 80,  # Second line, first part
+        "y" * 40,  # Second line, second part
+        "z" * 80,  # Third line, first part
+        "z" * 80,  # Third line, second part
+        "z" * 40,  # Third line, third part
+    ]
+    assert view[4] == "z" * 80
+
+    log.close()
 
 
-def test_custom_width_function(temp_cache_dir):
+def test_custom_width_function(tmp_path):
     """Test with custom width calculation."""
 
     def custom_width(line: str) -> int:
@@ -204,90 +207,105 @@ def test_custom_width_function(temp_cache_dir):
 
     content = "abc\ndefgh\n"
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_text(content)
 
-    try:
-        log = LogLogLog(log_path, get_width=custom_width, cache=Cache(temp_cache_dir))
+    log = LogLogLog(log_path, get_width=custom_width, cache=Cache(tmp_path / "cache"))
+
+    view = log.width(3)
+
+    # Line 0: "abc" = 3 chars -> 1 row
+    # Line 1: "defgh" = 5 chars -> 2 rows (ceil(5/3) = 2)
+    assert len(view) == 3
+    assert view[0] == "abc"
+    assert view[1] == "def"
+    assert view[2] == "gh"
+
+    log.close()
 
-        view = log.width(3)
 
-        # Line 0: "abc" = 3 chars -> 1 row
-        # Line 1: "defgh" = 5 chars -> 2 rows (ceil(5/3) = 2)
-        assert len(view) == 3
-        assert view[0] == "abc"
-        assert view[1] == "def"
-        assert view[2] == "gh"
+def test_len_width_function_counts_characters(tmp_path):
+    """Test that get_width=len measures characters on ASCII and non-ASCII chunks alike."""
+    lines = ["abc", "", "défgh", "日本語"]
 
+    for name, content in (("ascii.log", "abc\r\n\nxyzzy\n"), ("unicode.log", "\n".join(lines) + "\n")):
+        log_path = tmp_path / name
+        log_path.write_bytes(content.encode("utf-8"))
+        log = LogLogLog(log_path, get_width=len, cache=Cache(tmp_path / "cache"))
+        expected = [len(line) for line in content.replace("\r\n", "\n").split("\n")[:-1]]
+        assert [log._line_index.get_line_width(i) for i in range(len(log))] == expected
         log.close()
-    finally:
-        os.unlink(log_path)
 
 
-def test_progress_logging_large_file(temp_cache_dir, caplog):
+def test_progress_logging_large_file(tmp_path, caplog):
     """Test progress logging for large files (every 100k lines)."""
     # Create a log file with 100k+ lines to trigger progress logging
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        # Write 100,001 lines to trigger the progress log
-        for i in range(100001):
-            f.write(f"Line {i}\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    # Write 100,001 lines to trigger the progress log
+    log_path.write_text("".join(f"Line {i}\n" for i in range(100001)))
 
-    try:
-        # Enable logging to capture progress messages
-        import logging
+    # Enable logging to capture progress messages
+    import logging
 
-        caplog.set_level(logging.INFO)
+    caplog.set_level(logging.INFO)
 
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
 
-        # Check that progress was logged
-        assert any("Processed 100,000 lines" in record.message for record in caplog.records)
-        assert len(log) == 100001
+    # Check that progress was logged (lines are indexed in chunks, so the count is approximate)
+    assert any(re.match(r"Processed [\d,]+ lines in", record.message) for record in caplog.records)
+    assert len(log) == 100001
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
-def test_index_persistence(temp_cache_dir):
+def test_index_persistence(tmp_path):
     """Test that index persists across reopening."""
-    content = "Line 1\nLine 2\nLine 3\n"
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(THREE_LINES)
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+    # First open
+    log1 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log1) == 3
+    log1.close()
 
-    try:
-        # First open
-        log1 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log1) == 3
-        log1.close()
-
-        # Second open - should reuse index
-        log2 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log2) == 3
-        assert log2[0] == "Line 1"
-        log2.close()
-    finally:
-        os.unlink(log_path)
+    # Second open - should reuse index without scanning any lines again
+    log2 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log2) == 3
+    assert log2._version == 0
+    assert log2[0] == "Line 1"
+    log2.close()
 
 
-def test_context_manager(temp_cache_dir):
-    """Test LogLogLog as context manager."""
-    content = "Test line\n"
+def test_index_persists_without_close(tmp_path):
+    """Test that an index left open when the interpreter exits is still saved."""
+    log_path = tmp_path / "test.log"
+    log_path.write_text("".join(f"Line {i}\n" for i in range(5000)))
+
+    # Index and read rows, which maps views over the index files, then exit without close()
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from logloglog import LogLogLog\n"
+        "from logloglog.cache import Cache\n"
+        "log = LogLogLog(sys.argv[1], cache=Cache(Path(sys.argv[2])))\n"
+        "assert log.width(80)[4000] == 'Line 4000'\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script, str(log_path), str(tmp_path / "cache")], capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
+    assert b"BufferError" not in result.stderr
+
+    # Reopen - should reuse the full index without scanning any lines again
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 5000
+    assert log._version == 0
+    log.close()
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
 
-    try:
-        with LogLogLog(log_path, cache=Cache(temp_cache_dir)) as log:
-            assert len(log) == 1
-            assert log[0] == "Test line"
-    finally:
-        os.unlink(log_path)
+def test_context_manager(corpora, tmp_path):
+    """Test LogLogLog as context manager."""
+    with LogLogLog(corpora["single"], cache=Cache(tmp_path / "cache")) as log:
+        assert len(log) == 1
+        assert log[0] == "Test line"
 
 
 def test_negative_indexing_logloglog(log_with_content):
@@ -315,79 +333,78 @@ def test_negative_indexing_logloglog(log_with_content):
         _ = log[3]  # Too positive
 
 
-def test_file_modification_detection(temp_cache_dir):
+def test_file_modification_detection(tmp_path):
     """Test that file modifications are detected properly."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\n")
-        log_path = f.name
-
-    try:
-        # Create initial cache
-        log1 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log1) == 2
-        original_info = log1.get_file_info()
-
-        log1.close()
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\nLine 2\n")
 
-        # Modify file externally
-        import time
+    # Create initial cache
+    log1 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log1) == 2
+    original_info = log1.get_file_info()
 
-        time.sleep(0.1)  # Ensure different timestamp
-        with open(log_path, "a") as f:
-            f.write("Line 3\nLine 4\n")
-
-        # Reopen - should detect changes and update
-        log2 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log2) == 4
-        new_info = log2.get_file_info()
-        assert new_info["file_size"] > original_info["file_size"]
-        assert new_info["total_lines"] > original_info["total_lines"]
-        log2.close()
+    log1.close()
 
-    finally:
-        os.unlink(log_path)
+    # Modify file externally, with a timestamp that's visibly later without sleeping
+    append_lines(log_path, "Line 3", "Line 4")
+    stat = log_path.stat()
+    os.utime(log_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # Reopen - should detect changes and update
+    log2 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log2) == 4
+    new_info = log2.get_file_info()
+    assert new_info["file_size"] > original_info["file_size"]
+    assert new_info["total_lines"] > original_info["total_lines"]
+    log2.close()
 
 
-def test_file_truncation_detection(temp_cache_dir):
+def test_file_truncation_detection(tmp_path):
     """Test that file truncation is detected properly."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\nLine 3\nLine 4\n")
-        log_path = f.name
-
-    try:
-        # Create cache with full file
-        log1 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log1) == 4
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\nLine 2\nLine 3\nLine 4\n")
 
-        log1.close()
+    # Create cache with full file
+    log1 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log1) == 4
 
-        # Truncate file
-        with open(log_path, "w") as f:
-            f.write("New line 1\nNew line 2\n")
+    log1.close()
 
-        # Reopen - should detect truncation and rebuild
-        log2 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log2) == 2
-        assert log2[0] == "New line 1"
-        assert log2[1] == "New line 2"
-        log2.close()
+    # Truncate file
+    with open(log_path, "w") as f:
+        f.write("New line 1\nNew line 2\n")
 
-    finally:
-        os.unlink(log_path)
+    # Reopen - should detect truncation and rebuild
+    log2 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log2) == 2
+    assert log2[0] == "New line 1"
+    assert log2[1] == "New line 2"
+    log2.close()
 
 
-def test_ascii_fast_path(temp_cache_dir):
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("hello world", 11),
+        ("", 0),
+        ("timestamp: 2023-01-01 12:00:00", 30),
+        ("a" * 10000, 10000),
+        ("\t" + "x" * 9999, 10000),
+        # Unicode should still work
+        ("café", 4),
+        ("日本語", 6),
+    ],
+)
+def test_ascii_fast_path(line, expected):
     """Test that ASCII fast path works correctly."""
-    from logloglog.logloglog import default_get_width
+    from logloglog.logloglog import _unicode_width, default_get_width
 
-    # ASCII lines should be fast and correct
-    assert default_get_width("hello world") == 11
-    assert default_get_width("") == 0
-    assert default_get_width("timestamp: 2023-01-01 12:00:00") == 30
+    misses = _unicode_width.cache_info().misses
+    assert default_get_width(line) == expected
 
-    # Unicode should still work
-    assert default_get_width("café") == 4
-    assert default_get_width("日本語") == 6
+    # ASCII lines, however long, never reach the wcwidth slow path
+    if line.isascii():
+        assert _unicode_width.cache_info().misses == misses
 
 
 def test_default_split_lines_edge_cases():
@@ -431,38 +448,31 @@ def test_logloglog_indexerror_out_of_bounds(log_with_content):
         _ = log[total_lines + 100]
 
 
-def test_corrupted_index_recovery(temp_cache_dir):
+def test_corrupted_index_recovery(tmp_path):
     """Test recovery when index files are corrupted."""
-    content = "Line 1\nLine 2\nLine 3\n"
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(THREE_LINES)
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+    # First, create a valid index
+    log1 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log1) == 3
+    cache_info = log1.get_cache_info()
+    index_path = Path(cache_info["cache_dir"])
+    log1.close()
 
-    try:
-        # First, create a valid index
-        log1 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log1) == 3
-        cache_info = log1.get_cache_info()
-        index_path = Path(cache_info["cache_dir"])
-        log1.close()
-
-        # Corrupt the line_offsets file
-        corrupted_offsets_path = index_path / "line_offsets.dat"
-        with open(corrupted_offsets_path, "wb") as f:
-            f.write(b"corrupted data that will cause errors")
-
-        # Should detect corruption and rebuild
-        log2 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log2) == 3  # Should still work after rebuild
-        assert log2[0] == "Line 1"
-        log2.close()
+    # Corrupt the line_offsets file
+    corrupted_offsets_path = index_path / "line_offsets.dat"
+    with open(corrupted_offsets_path, "wb") as f:
+        f.write(b"corrupted data that will cause errors")
 
-    finally:
-        os.unlink(log_path)
+    # Should detect corruption and rebuild
+    log2 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log2) == 3  # Should still work after rebuild
+    assert log2[0] == "Line 1"
+    log2.close()
 
 
-def test_custom_split_lines_function(temp_cache_dir):
+def test_custom_split_lines_function(tmp_path):
     """Test LogLogLog with custom split_lines function."""
 
     # Test that custom split_lines function is stored and accessible
@@ -476,37 +486,28 @@ def test_custom_split_lines_function(temp_cache_dir):
 
     content = "line1\nline2\nline3\n"
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_text(content)
 
-    try:
-        log = LogLogLog(log_path, split_lines=custom_split, cache=Cache(temp_cache_dir))
+    log = LogLogLog(log_path, split_lines=custom_split, cache=Cache(tmp_path / "cache"))
 
-        # Verify the custom split function was assigned
-        assert log.split_lines == custom_split
+    # Verify the custom split function was assigned
+    assert log.split_lines == custom_split
 
-        # Test the function directly
-        test_text = "a;b;c;"
-        result = log.split_lines(test_text)
-        assert result == ["a", "b", "c"]
+    # Test the function directly
+    test_text = "a;b;c;"
+    result = log.split_lines(test_text)
+    assert result == ["a", "b", "c"]
 
-        log.close()
-
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
 @pytest.fixture
-def temp_log_with_content(temp_cache_dir):
+def temp_log_with_content(tmp_path):
     """Create a temporary log file with test content."""
-    content = "Line 1\nLine 2\nLine 3\n"
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
-
-    yield log_path, temp_cache_dir
-    os.unlink(log_path)
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(THREE_LINES)
+    return log_path, tmp_path / "cache"
 
 
 def test_index_loading_with_existing_offsets(temp_log_with_content):
@@ -532,34 +533,29 @@ def test_index_loading_with_existing_offsets(temp_log_with_content):
     log2.close()
 
 
-def test_file_truncation_scenario(temp_cache_dir):
+def test_file_truncation_scenario(tmp_path):
     """Test file truncation detection to cover lines 220-232."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\nLine 3\nLine 4\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\nLine 2\nLine 3\nLine 4\n")
 
-    try:
-        # Create cache with full file
-        log1 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log1) == 4
-        original_info = log1.get_file_info()
-        log1.close()
-
-        # Truncate file to be smaller
-        with open(log_path, "w") as f:
-            f.write("New content\n")
-
-        # Reopen - should detect truncation and rebuild
-        log2 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log2) == 1
-        assert log2[0] == "New content"
-        new_info = log2.get_file_info()
-        assert new_info["file_size"] < original_info["file_size"]
-        assert new_info["total_lines"] < original_info["total_lines"]
-        log2.close()
+    # Create cache with full file
+    log1 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log1) == 4
+    original_info = log1.get_file_info()
+    log1.close()
 
-    finally:
-        os.unlink(log_path)
+    # Truncate file to be smaller
+    with open(log_path, "w") as f:
+        f.write("New content\n")
+
+    # Reopen - should detect truncation and rebuild
+    log2 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log2) == 1
+    assert log2[0] == "New content"
+    new_info = log2.get_file_info()
+    assert new_info["file_size"] < original_info["file_size"]
+    assert new_info["total_lines"] < original_info["total_lines"]
+    log2.close()
 
 
 def test_index_cleanup_exception_handling(temp_log_with_content):
@@ -583,272 +579,329 @@ def test_index_cleanup_exception_handling(temp_log_with_content):
     log.close()  # Original log close
 
 
-def test_empty_index_loading(temp_cache_dir):
+def test_empty_index_loading(tmp_path):
     """Test loading LogLogLog with completely empty index to cover lines 134-135."""
     # Create a log file with content first, then simulate empty index on reload
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\n")
+
+    # Create LogLogLog first to create index files
+    log1 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log1) == 1
+    cache_info = log1.get_cache_info()
+    index_path = Path(cache_info["cache_dir"])
+    log1.close()
 
-    try:
-        # Create LogLogLog first to create index files
-        log1 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log1) == 1
-        cache_info = log1.get_cache_info()
-        index_path = Path(cache_info["cache_dir"])
-        log1.close()
-
-        # Now create empty index files to simulate empty index scenario
-        positions_file = index_path / "positions.dat"
-        widths_file = index_path / "widths.dat"
-        summaries_file = index_path / "summaries.dat"
-
-        # Truncate index files to simulate empty index
-        with open(positions_file, "wb") as f:
-            pass  # Empty file
-        with open(widths_file, "wb") as f:
-            pass  # Empty file
-        with open(summaries_file, "wb") as f:
-            pass  # Empty file
-
-        # Reopen - should handle empty index and rebuild
-        log2 = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log2) == 1  # Should rebuild from log file
-        log2.close()
-    finally:
-        os.unlink(log_path)
+    # Now create empty index files to simulate empty index scenario
+    positions_file = index_path / "positions.dat"
+    widths_file = index_path / "widths.dat"
+    summaries_file = index_path / "summaries.dat"
 
+    # Truncate index files to simulate empty index
+    positions_file.write_bytes(b"")
+    widths_file.write_bytes(b"")
+    summaries_file.write_bytes(b"")
 
-def test_index_line_access_error(temp_cache_dir):
-    """Test IndexError when accessing non-existent lines to cover line 322."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\n")
-        log_path = f.name
+    # Reopen - should handle empty index and rebuild
+    log2 = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log2) == 1  # Should rebuild from log file
+    log2.close()
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
 
-        # Test accessing beyond available lines
-        with pytest.raises(IndexError, match="Line 2 out of range"):
-            _ = log[2]
+def test_index_line_access_error(log_with_content):
+    """Test IndexError when accessing non-existent lines to cover line 322."""
+    log = log_with_content
 
-        # Test negative indexing beyond bounds
-        with pytest.raises(IndexError, match="Line -1 out of range"):
-            _ = log[-3]  # -3 + 2 lines = -1, which is out of range
+    # Test accessing beyond available lines
+    with pytest.raises(IndexError, match="Line 3 out of range"):
+        _ = log[3]
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    # Test negative indexing beyond bounds
+    with pytest.raises(IndexError, match="Line -1 out of range"):
+        _ = log[-4]  # -4 + 3 lines = -1, which is out of range
 
 
-def test_empty_line_index(temp_cache_dir):
+def test_empty_line_index(tmp_path):
     """Test empty line index handling (lines 135-136)."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        # Create empty file
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    # Create empty file
+    log_path.touch()
 
-    try:
-        # First, create the index files by opening and closing
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 0
-        log.close()
+    # First, create the index files by opening and closing
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 0
+    log.close()
 
-        # Now open again - this will load the existing empty index
-        # and trigger lines 135-136
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 0
-        log.close()
-    finally:
-        os.unlink(log_path)
+    # Now open again - this will load the existing empty index
+    # and trigger lines 135-136
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 0
+    log.close()
 
 
-def test_file_size_cache_missing(temp_cache_dir):
+def test_file_size_cache_missing(log_with_content):
     """Test missing file size cache (lines 185-186)."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Test line\n")
-        log_path = f.name
+    # Check initial cache state
+    cache_info = log_with_content.get_cache_info()
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
+    # Cache should exist after opening the file
+    assert cache_info["has_file_size_cache"]
 
-        # Check initial cache state
-        cache_info = log.get_cache_info()
 
-        # Cache should exist after opening the file
-        assert cache_info["has_file_size_cache"]
+def test_file_size_cache_rewritten_only_on_change(tmp_path):
+    """Test that updates only rewrite the cached file size when the file has changed size."""
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Test line\n")
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    size_path = log._index_path / "file_size.dat"
+    inode = size_path.stat().st_ino
+
+    # Nothing new, so the cached size stays as it was
+    log.update()
+    assert size_path.stat().st_ino == inode
+
+    append_lines(log_path, "Another line")
+    log.update()
+    assert int(size_path.read_text()) == log_path.stat().st_size
+
+    log.close()
 
 
-def test_file_truncation_during_update(temp_cache_dir):
+def test_file_truncation_during_update(tmp_path):
     """Test file truncation/rotation handling (lines 224-231)."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\nLine 3\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(THREE_LINES)
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        # Initial load
-        assert len(log) == 3
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    # Initial load
+    assert len(log) == 3
 
-        # Truncate the file
-        with open(log_path, "w") as f:
-            f.write("New line 1\n")
+    # Truncate the file
+    with open(log_path, "w") as f:
+        f.write("New line 1\n")
 
-        # Update should detect truncation and rebuild index
-        log.update()
-        assert len(log) == 1
-        assert log[0] == "New line 1"
+    # Update should detect truncation and rebuild index
+    log.update()
+    assert len(log) == 1
+    assert log[0] == "New line 1"
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
-def test_row_for_line(temp_cache_dir):
+def test_row_for_line(tmp_path):
     """Test row_for_line method."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
+    log_path = tmp_path / "test.log"
+    with open(log_path, "w") as f:
         # Write lines with different widths
         f.write("Short\n")  # width 5
         f.write("A much longer line that will wrap\n")  # width > 30
         f.write("Medium line\n")  # width 11
-        log_path = f.name
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
 
-        # Test getting display row for each line at different widths
-        # At width 10:
-        # Line 0: 1 row (5 chars)
-        # Line 1: 4 rows (34 chars)
-        # Line 2: 2 rows (11 chars)
+    # Test getting display row for each line at different widths
+    # At width 10:
+    # Line 0: 1 row (5 chars)
+    # Line 1: 4 rows (34 chars)
+    # Line 2: 2 rows (11 chars)
 
-        row = log.row_for_line(0, 10)
-        assert row == 0  # First line starts at row 0
+    row = log.row_for_line(0, 10)
+    assert row == 0  # First line starts at row 0
 
-        row = log.row_for_line(1, 10)
-        assert row == 1  # Second line starts after first line (1 row)
+    row = log.row_for_line(1, 10)
+    assert row == 1  # Second line starts after first line (1 row)
 
-        row = log.row_for_line(2, 10)
-        assert row == 5  # Third line starts after first two (1 + 4 rows)
+    row = log.row_for_line(2, 10)
+    assert row == 5  # Third line starts after first two (1 + 4 rows)
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
 # Async tests for new async functionality
 
 
 @pytest.mark.asyncio
-async def test_aupdate_async_method(temp_cache_dir):
+async def test_aupdate_async_method(tmp_path):
     """Test async update method works correctly."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\nLine 2\n")
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        initial_len = len(log)
-        assert initial_len == 2
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    initial_len = len(log)
+    assert initial_len == 2
 
-        # Add more content to the file
-        with open(log_path, "a") as f:
-            f.write("Line 3\nLine 4\n")
+    # Add more content to the file
+    append_lines(log_path, "Line 3", "Line 4")
 
-        # Use async update
-        await log.aupdate()
+    # Use async update
+    await log.aupdate()
 
-        # Should detect new lines
-        assert len(log) == 4
-        assert log[2] == "Line 3"
-        assert log[3] == "Line 4"
+    # Should detect new lines
+    assert len(log) == 4
+    assert log[2] == "Line 3"
+    assert log[3] == "Line 4"
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
 @pytest.mark.asyncio
-async def test_aupdate_with_large_file(temp_cache_dir):
+async def test_aupdate_with_large_file(tmp_path):
     """Test async update with larger file to test periodic yielding."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        # Write many lines to test yielding behavior
-        for i in range(2000):
-            f.write(f"Line {i}\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    # Write many lines to test yielding behavior
+    log_path.write_text("".join(f"Line {i}\n" for i in range(2000)))
 
-    try:
-        # Create log
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
+    # Create log
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
 
-        # Should have processed all lines during init
-        assert len(log) == 2000
-        assert log[0] == "Line 0"
-        assert log[1999] == "Line 1999"
+    # Should have processed all lines during init
+    assert len(log) == 2000
+    assert log[0] == "Line 0"
+    assert log[1999] == "Line 1999"
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
 @pytest.mark.asyncio
-async def test_aupdate_truncation_detection(temp_cache_dir):
+async def test_aupdate_truncation_detection(tmp_path):
     """Test async update detects file truncation."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write("Line 1\nLine 2\nLine 3\nLine 4\n")
-        log_path = f.name
+    log_path = tmp_path / "test.log"
+    log_path.write_text("Line 1\nLine 2\nLine 3\nLine 4\n")
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 4
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 4
 
-        # Truncate the file
-        with open(log_path, "w") as f:
-            f.write("New line\n")
+    # Truncate the file
+    with open(log_path, "w") as f:
+        f.write("New line\n")
 
-        # Use async update - should detect truncation
-        await log.aupdate()
+    # Use async update - should detect truncation
+    await log.aupdate()
 
-        assert len(log) == 1
-        assert log[0] == "New line"
+    assert len(log) == 1
+    assert log[0] == "New line"
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
 
 
 @pytest.mark.asyncio
-async def test_async_width_calculation_in_thread(temp_cache_dir):
+async def test_async_width_calculation_in_thread(tmp_path):
     """Test that width calculation runs in thread during async update."""
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
+    log_path = tmp_path / "test.log"
+    with open(log_path, "w") as f:
         # Write lines with unicode characters to test width calculation
         f.write("café\n")  # Should be width 4
         f.write("日本語\n")  # Should be width 6
         f.write("normal text\n")  # Should be width 11
-        log_path = f.name
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        assert len(log) == 3
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    assert len(log) == 3
 
-        # Add more unicode content
-        with open(log_path, "a") as f:
-            f.write("emoji: 😀\n")
-            f.write("complex: 👨‍👩‍👧‍👦\n")
+    # Add more unicode content
+    append_lines(log_path, "emoji: 😀", "complex: 👨‍👩‍👧‍👦")
 
-        # Use async update - width calculation should run in thread
-        await log.aupdate()
+    # Use async update - width calculation should run in thread
+    await log.aupdate()
 
-        assert len(log) == 5
-        assert log[0] == "café"
-        assert log[1] == "日本語"
-        assert log[2] == "normal text"
-        assert log[3] == "emoji: 😀"
-        assert log[4] == "complex: 👨‍👩‍👧‍👦"
+    assert len(log) == 5
+    assert log[0] == "café"
+    assert log[1] == "日本語"
+    assert log[2] == "normal text"
+    assert log[3] == "emoji: 😀"
+    assert log[4] == "complex: 👨‍👩‍👧‍👦"
 
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log.close()
+
+
+def test_parallel_indexing_matches_sequential(tmp_path, monkeypatch):
+    """Test that splitting the initial scan across processes gives the same index."""
+    import logloglog.logloglog as logloglog_module
+
+    log_path = tmp_path / "parallel.log"
+    lines = [f"Line {i} " + "x" * (i % 97) for i in range(5000)] + ["日本語", "", "last"]
+    log_path.write_text("\n".join(lines) + "\n")
+
+    monkeypatch.setattr(logloglog_module, "PARALLEL_INDEX_THRESHOLD", 0)
+    monkeypatch.setattr(logloglog_module.os, "cpu_count", lambda: 4)
+
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "parallel"), parallel_indexing=True)
+    assert len(log) == len(lines)
+    assert log[0] == lines[0]
+    assert log[2500] == lines[2500]
+    assert log[-3] == "日本語"
+    assert log[-1] == "last"
+    assert log._line_index.get_line_width(len(lines) - 3) == 6
+
+    expected_rows = sum(max(1, (len(line) + 79) // 80) for line in lines[:-3]) + 3
+    assert len(log.width(80)) == expected_rows
+
+    # Appending after a parallel scan continues from the right position
+    append_lines(log_path, "more")
+    log.update()
+    assert log[-1] == "more"
+    log.close()
+
+
+def test_parallel_indexing_falls_back_to_sequential(tmp_path, monkeypatch):
+    """Test that a broken worker pool hands the rest of the scan to the sequential loop."""
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+    import logloglog.logloglog as logloglog_module
+
+    class FirstRangeOnlyExecutor:
+        """Runs the first range in-process, then fails as if the workers died."""
+
+        def __init__(self, max_workers):
+            self.submitted = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def submit(self, fn, *args):
+            future = Future()
+            if self.submitted == 0:
+                future.set_result(fn(*args))
+            else:
+                future.set_exception(BrokenProcessPool("worker died"))
+            self.submitted += 1
+            return future
+
+    log_path = tmp_path / "fallback.log"
+    lines = [f"Line {i}" for i in range(5000)]
+    log_path.write_text("\n".join(lines) + "\n")
+
+    monkeypatch.setattr(logloglog_module, "PARALLEL_INDEX_THRESHOLD", 0)
+    monkeypatch.setattr(logloglog_module.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(logloglog_module, "ProcessPoolExecutor", FirstRangeOnlyExecutor)
+
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "fallback"), parallel_indexing=True)
+    assert len(log) == len(lines)
+    assert log[1249] == lines[1249]
+    assert log[1250] == lines[1250]
+    assert log[-1] == lines[-1]
+    log.close()
+
+
+def test_default_get_widths_batch():
+    """Test batch width calculation for raw lines."""
+    from logloglog.logloglog import default_get_widths, strip_carriage_returns
+
+    # All-ASCII batch
+    assert default_get_widths([b"hello", b"", b"x" * 300]) == [5, 0, 300]
+
+    # Mixed batch falls back per line
+    assert default_get_widths([b"abc", "café".encode(), "日本語".encode()]) == [3, 4, 6]
+
+    assert strip_carriage_returns([b"crlf\r", b"lf", b""]) == [b"crlf", b"lf", b""]
+
+
+def test_default_split_lines_keeps_other_separators():
+    """Test that only CR/LF end lines, not other characters splitlines() treats as breaks."""
+    from logloglog.logloglog import default_split_lines
+
+    assert default_split_lines("page\x0cbreak\nvtab\x0bhere\n") == ["page\x0cbreak", "vtab\x0bhere"]
+    assert default_split_lines("a b\r\n\nc") == ["a b", "", "c"]
@@ -1,86 +1,55 @@
 """Tests for WidthView functionality."""
 
-import tempfile
-import os
 import pytest
-from pathlib import Path
 
 from logloglog import LogLogLog
 from logloglog.cache import Cache
 
 
 @pytest.fixture
-def temp_cache_dir():
-    """Create a temporary cache directory."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
-
-
-@pytest.fixture
-def simple_log(temp_cache_dir):
+def simple_log(tmp_path):
     """Create a simple log file with a few lines."""
-    content = "Line 1\nLine 2\nLine 3\n"
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(b"Line 1\nLine 2\nLine 3\n")
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
-
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        yield log
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log = LogLogLog(log_path, cache=Cache(tmp_path / "cache"))
+    yield log
+    log.close()
 
 
 @pytest.fixture
-def log_with_custom_content(temp_cache_dir):
+def log_with_custom_content(tmp_path):
     """Factory fixture to create log files with custom content."""
-    created_files = []
+    logs = []
 
     def _create_log(content):
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-            f.write(content)
-            log_path = f.name
-        created_files.append(log_path)
-        return LogLogLog(log_path, cache=Cache(temp_cache_dir))
+        log_path = tmp_path / f"test{len(logs)}.log"
+        log_path.write_bytes(content.encode())
+        logs.append(LogLogLog(log_path, cache=Cache(tmp_path / "cache")))
+        return logs[-1]
 
     yield _create_log
 
-    # Cleanup
-    for path in created_files:
-        try:
-            os.unlink(path)
-        except FileNotFoundError:
-            pass
-
-
-@pytest.fixture
-def log_with_incremental_lines(temp_cache_dir):
-    """Create a log file with incremental line lengths for testing."""
-    lines = []
+    for log in logs:
+        log.close()
 
-    # Lines from 0 to 80 chars: "0", "01", "012", ...
-    for i in range(81):
-        line = "".join(str(j % 10) for j in range(i))
-        lines.append(line)
 
-    # Add a 1024 char line
-    line_1024 = "".join(str(j % 10) for j in range(1024))
-    lines.append(line_1024)
+# Incremental line lengths: lines from 0 to 80 chars ("", "0", "01", ...) then a 1024 char
+# line, each a prefix of the same repeating digits
+INCREMENTAL_LINE_LENGTHS = [*range(81), 1024]
+INCREMENTAL_LINES_CONTENT = "".join(("0123456789" * 103)[:length] + "\n" for length in INCREMENTAL_LINE_LENGTHS)
 
-    content = "\n".join(lines) + "\n"
 
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f:
-        f.write(content)
-        log_path = f.name
+@pytest.fixture(scope="module")
+def log_with_incremental_lines(tmp_path_factory):
+    """Create a log file with incremental line lengths, shared by read-only tests."""
+    tmp_dir = tmp_path_factory.mktemp("incremental_lines")
+    log_path = tmp_dir / "test.log"
+    log_path.write_bytes(INCREMENTAL_LINES_CONTENT.encode())
 
-    try:
-        log = LogLogLog(log_path, cache=Cache(temp_cache_dir))
-        yield log
-        log.close()
-    finally:
-        os.unlink(log_path)
+    log = LogLogLog(log_path, cache=Cache(tmp_dir / "cache"))
+    yield log
+    log.close()
 
 
 def test_view_width_consistency(log_with_custom_content):
@@ -111,10 +80,9 @@ def test_view_width_consistency(log_with_custom_content):
     assert len_50 >= 3
     assert len_200 >= 3
 
-    log.close()
-
 
-def test_incremental_view_calculations(log_with_incremental_lines):
+@pytest.mark.parametrize("width", [10, 20, 40, 80, 160])
+def test_incremental_view_calculations(log_with_incremental_lines, width):
     """Test view calculations with incremental line lengths."""
     log = log_with_incremental_lines
 
@@ -128,27 +96,14 @@ def test_incremental_view_calculations(log_with_incremental_lines):
     assert len(log[80]) == 80  # 80 chars
     assert len(log[81]) == 1024  # 1024 chars
 
-    # Test views at different widths
-    test_widths = [10, 20, 40, 80, 160]
-
-    for width in test_widths:
-        view = log.width(width)
-        view_rows = len(view)
+    view = log.width(width)
+    view_rows = len(view)
 
-        # Manual calculation
-        expected_rows = 0
-        for i in range(len(log)):
-            line_width = len(log[i])
-            rows_for_line = max(1, (line_width + width - 1) // width) if line_width > 0 else 1
-            expected_rows += rows_for_line
+    # Manual calculation from the known line lengths
+    expected_rows = sum(max(1, (length + width - 1) // width) for length in INCREMENTAL_LINE_LENGTHS)
 
-        print(f"\nWidth {width}:")
-        print(f"  View reports: {view_rows} rows")
-        print(f"  Expected: {expected_rows} rows")
-        print(f"  Match: {view_rows == expected_rows}")
-
-        # The key test: view calculation should match manual calculation
-        assert view_rows == expected_rows, f"Width {width}: expected {expected_rows} rows, got {view_rows}"
+    # The key test: view calculation should match manual calculation
+    assert view_rows == expected_rows, f"Width {width}: expected {expected_rows} rows, got {view_rows}"
 
 
 def test_view_negative_indexing(log_with_incremental_lines):
@@ -183,9 +138,6 @@ def test_multi_line_wrapping(log_with_custom_content):
     # Test at width 20 - the 100-char line should become 5 rows
     view = log.width(20)
 
-    print("\nTesting 100-char line at width 20:")
-    print(f"Total view rows: {len(view)}")
-
     # Should have:
     # Row 0: "short" (5 chars -> 1 row)
     # Row 1-5: 100-char line split into 5 rows of 20 chars each
@@ -203,10 +155,6 @@ def test_multi_line_wrapping(log_with_custom_content):
     assert view[5] == "x" * 20  # Last 20 chars
     assert view[6] == "end"
 
-    print("✓ Multi-line wrapping works correctly")
-
-    log.close()
-
 
 def test_view_with_real_file(log_with_custom_content):
     """Test view creation works with actual content."""
@@ -227,22 +175,53 @@ def test_view_with_real_file(log_with_custom_content):
     first_row = view[0]
     assert first_row == "Short line"
 
-    log.close()
-
 
 def test_view_iteration(simple_log):
     """Test WidthView __iter__ method to cover lines 79-80."""
     view = simple_log.width(80)
+    expected = ["Line 1", "Line 2", "Line 3"]
+
+    # Count and spot check rows without materializing them
+    assert len(view) == 3
+    assert view[0] == expected[0] and view[-1] == expected[-1]
+
+    # Test iteration in a loop, which streams rows through __iter__
+    for count, (row, expected_row) in enumerate(zip(view, expected), 1):
+        assert row == expected_row
+        if count == 2:
+            break  # Stopping part way through is fine for a lazy iterator
+    assert sum(1 for _ in view) == len(view)
 
-    # Test iteration using __iter__
+
+def test_view_length_follows_appends(simple_log):
+    """A long-lived view's cached length is refreshed when the log grows."""
+    view = simple_log.width(4)
+    assert len(view) == 6
+
+    simple_log.append("Line 4")
+    assert len(view) == 8
+    assert view[-1] == " 4"
+
+
+@pytest.mark.parametrize("width", [1, 3, 7, 80, 600])
+def test_view_iteration_matches_indexing(log_with_custom_content, width):
+    """Streaming iteration yields exactly the rows indexing does."""
+    log = log_with_custom_content("short\n\n" + "x" * 1500 + "\n日本語テキスト\nend\n")
+    view = log.width(width)
     rows = list(view)
-    assert rows == ["Line 1", "Line 2", "Line 3"]
+    assert rows == [view[i] for i in range(len(view))]
+    # Backwards lookups can't step on from the previous row
+    assert rows == [view[i] for i in reversed(range(len(view)))][::-1]
 
-    # Test iteration in a loop
-    collected = []
-    for row in view:  # This also uses __iter__
-        collected.append(row)
-    assert collected == ["Line 1", "Line 2", "Line 3"]
+
+@pytest.mark.parametrize("width", [1, 7, 80])
+def test_get_rows_matches_slicing(log_with_custom_content, width):
+    """Batched row ranges starting mid-line match slicing the full list of rows."""
+    log = log_with_custom_content("short\n\n" + "x" * 500 + "\nend\n")
+    view = log.width(width)
+    rows = list(view)
+    for start, stop in [(0, len(rows)), (1, 4), (3, len(rows) + 10), (-2, None), (5, 2)]:
+        assert view.get_rows(start, len(rows) if stop is None else stop) == rows[start:stop]
 
 
 def test_view_zero_width(simple_log):
@@ -301,5 +280,3 @@ def test_row_for_method(log_with_custom_content):
 
     # Line 2: "End" - starts at row 6 (after 1 + 5 rows)
     assert view.row_for(2) == 6
-
-    log.close()